@@ -0,0 +1,194 @@
+"""
+Acondicionamiento de señales de landmarks
+
+Etapa vectorizada para post-procesar los datos de pose:
+1. Estima la frecuencia de muestreo real a partir de los timestamps
+   (la captura no llega a un frame rate constante, p. ej. ~7.8 FPS).
+2. Remuestrea todos los canales a una grilla temporal uniforme en un solo paso.
+3. Filtra la matriz completa (n_frames, n_canales) con un Butterworth en
+   secciones de segundo orden (SOS) cuyo diseño queda en caché.
+4. Calcula derivadas de todos los canales a lo largo del eje temporal.
+
+Así filtrar y derivar los 99 canales de coordenadas (33 landmarks x 3) cuesta lo mismo que
+filtrar una sola columna.
+"""
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Columnas de coordenadas de landmarks en los CSV exportados (landmark_<i>_<x|y|z>)
+PATRON_LANDMARK = re.compile(r'^landmark_\d+_[xyz]$')
+
+# Cortes nominales (Hz) pensados para ~30 FPS: centro de masa y landmarks
+CORTE_COM_HZ = 10.0
+CORTE_LANDMARKS_HZ = 6.0
+# Fracción de Nyquist máxima para un corte pedido: por encima el filtro casi no atenúa
+FRACCION_NYQUIST_MAX = 0.9
+# Fracción de Nyquist del corte por defecto cuando el nominal no es alcanzable
+FRACCION_NYQUIST_POR_DEFECTO = 0.5
+
+
+def cargar_csv(ruta):
+    """
+    Carga un CSV de análisis detectando el formato
+    Los CSV de la interfaz de adquisición usan formato europeo (';' y ','),
+    los del prototipo usan el formato por defecto de pandas.
+    """
+    with open(ruta, encoding='utf-8') as archivo:
+        cabecera = archivo.readline()
+    if ';' in cabecera:
+        return pd.read_csv(ruta, sep=';', decimal=',')
+    return pd.read_csv(ruta)
+
+
+def columnas_landmarks(columnas):
+    """Devuelve las columnas de coordenadas de landmarks en su orden original"""
+    return [c for c in columnas if PATRON_LANDMARK.match(c)]
+
+
+def estimar_frecuencia_muestreo(timestamps):
+    """
+    Estima la frecuencia de muestreo real (Hz) como 1 / mediana del intervalo
+    La mediana ignora pausas aisladas y frames duplicados.
+    """
+    dt = np.diff(np.asarray(timestamps, dtype=float))
+    dt = dt[dt > 0]
+    if len(dt) == 0:
+        raise ValueError("Se necesitan al menos dos timestamps distintos")
+    return 1.0 / float(np.median(dt))
+
+
+def _preparar_muestras(timestamps, matriz):
+    """
+    Ordena por tiempo, elimina timestamps repetidos y filas sin detección
+    Las filas con todos los canales en NaN (pose no detectada) se descartan
+    para que la interpolación las rellene; los NaN sueltos se interpolan por canal.
+    """
+    t = np.asarray(timestamps, dtype=float)
+    m = np.asarray(matriz, dtype=float)
+    if m.ndim == 1:
+        m = m[:, None]
+
+    validas = ~np.isnan(m).all(axis=1) & ~np.isnan(t)
+    t, m = t[validas], m[validas]
+
+    # np.unique ordena y se queda con la primera muestra de cada timestamp
+    t, indices = np.unique(t, return_index=True)
+    m = m[indices]
+
+    huecos = np.isnan(m)
+    if huecos.any():
+        m = m.copy()
+        for canal in np.flatnonzero(huecos.any(axis=0)):
+            ok = ~huecos[:, canal]
+            if ok.any():
+                m[~ok, canal] = np.interp(t[~ok], t[ok], m[ok, canal])
+    return t, m
+
+
+def interpolar_matriz(t_origen, matriz, t_destino):
+    """
+    Interpolación lineal de todos los canales a la vez
+    Args:
+        t_origen: Timestamps crecientes de las muestras (n,)
+        matriz: Muestras (n, canales)
+        t_destino: Timestamps donde evaluar (k,)
+    Returns:
+        Matriz (k, canales); fuera del rango se mantiene el valor del extremo
+    """
+    t_destino = np.clip(np.asarray(t_destino, dtype=float), t_origen[0], t_origen[-1])
+    if len(t_origen) == 1:
+        return np.repeat(matriz, len(t_destino), axis=0)
+
+    # Índice de la muestra izquierda de cada punto destino y peso de la derecha
+    izq = np.clip(np.searchsorted(t_origen, t_destino, side='right') - 1, 0, len(t_origen) - 2)
+    peso = (t_destino - t_origen[izq]) / (t_origen[izq + 1] - t_origen[izq])
+    peso = peso[:, None]
+    return matriz[izq] * (1.0 - peso) + matriz[izq + 1] * peso
+
+
+def remuestrear_uniforme(timestamps, matriz, frecuencia=None):
+    """
+    Remuestrea todos los canales a una grilla temporal uniforme
+    Args:
+        timestamps: Tiempo de cada fila (s), no necesariamente equiespaciado
+        matriz: Datos (n_frames, n_canales); NaN = muestra faltante
+        frecuencia: Frecuencia de la grilla (Hz). Si es None se estima de los timestamps
+    Returns:
+        (t_uniforme, matriz_uniforme, frecuencia)
+    """
+    t, m = _preparar_muestras(timestamps, matriz)
+    if len(t) < 2:
+        raise ValueError("No hay suficientes muestras válidas para remuestrear")
+    if frecuencia is None:
+        frecuencia = estimar_frecuencia_muestreo(t)
+
+    num_muestras = int(np.floor((t[-1] - t[0]) * frecuencia)) + 1
+    t_uniforme = t[0] + np.arange(num_muestras) / frecuencia
+    return t_uniforme, interpolar_matriz(t, m, t_uniforme), frecuencia
+
+
+def elegir_corte(corte_nominal, frecuencia):
+    """
+    Corte por defecto adaptado a la frecuencia de muestreo estimada
+    Usa el corte nominal si la frecuencia lo permite; si no, la mitad de
+    Nyquist, que todavía suaviza (un corte cerca de Nyquist casi no filtra).
+    """
+    maximo = FRACCION_NYQUIST_POR_DEFECTO * frecuencia / 2
+    if corte_nominal <= maximo:
+        return corte_nominal
+    print(f"⚠️  Muestreo de {frecuencia:.1f} Hz: corte de {corte_nominal:g} Hz no alcanzable, "
+          f"se usa {maximo:.2f} Hz")
+    return maximo
+
+
+@lru_cache(maxsize=32)
+def _sos_butterworth(orden, corte_normalizado):
+    from scipy import signal
+    return signal.butter(orden, corte_normalizado, btype='low', output='sos')
+
+
+def disenar_filtro_sos(corte, frecuencia, orden=2):
+    """
+    Devuelve un Butterworth pasa-bajas en formato SOS (diseño en caché)
+    La frecuencia de corte se limita a FRACCION_NYQUIST_MAX de Nyquist, ya que
+    con la frecuencia real de captura un corte fijo puede no ser válido; en
+    ese caso se avisa con el corte realmente aplicado.
+    """
+    corte_normalizado = corte / (frecuencia / 2)
+    if corte_normalizado > FRACCION_NYQUIST_MAX:
+        corte_normalizado = FRACCION_NYQUIST_MAX
+        print(f"⚠️  Corte de {corte:g} Hz sobre Nyquist para {frecuencia:.1f} Hz: se aplica "
+              f"{corte_normalizado * frecuencia / 2:.2f} Hz y el filtro casi no atenúa")
+    # Redondear evita entradas de caché distintas por ruido en la frecuencia estimada
+    return _sos_butterworth(int(orden), round(corte_normalizado, 4))
+
+
+def filtrar_matriz(matriz, corte, frecuencia, orden=2):
+    """
+    Filtrado de fase cero de todos los canales con una sola llamada por eje
+    Args:
+        matriz: Datos uniformemente muestreados (n_frames, n_canales)
+        corte: Frecuencia de corte (Hz)
+        frecuencia: Frecuencia de muestreo (Hz)
+        orden: Orden del Butterworth
+    """
+    from scipy import signal
+    matriz = np.asarray(matriz, dtype=float)
+    if len(matriz) < 2:
+        return matriz.copy()
+    sos = disenar_filtro_sos(corte, frecuencia, orden)
+    # El relleno por defecto de sosfiltfilt falla en señales muy cortas
+    padlen = min(3 * (2 * len(sos) + 1), len(matriz) - 1)
+    return signal.sosfiltfilt(sos, matriz, axis=0, padlen=padlen)
+
+
+def derivar_matriz(matriz, frecuencia):
+    """Derivada temporal de todos los canales (diferencias centrales)"""
+    matriz = np.asarray(matriz, dtype=float)
+    if len(matriz) < 2:
+        return np.zeros_like(matriz)
+    return np.gradient(matriz, 1.0 / frecuencia, axis=0)
+
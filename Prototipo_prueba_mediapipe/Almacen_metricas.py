@@ -0,0 +1,349 @@
+"""
+Almacén consolidado de métricas de salto (SQLite)
+
+Reemplaza los archivos jump_summary_<ts>.csv de una fila: cada análisis
+agrega una fila a una única base de datos, de solo inserción, con índices
+para las consultas habituales:
+- historial de un atleta en el tiempo
+- resumen por tipo de sesión (agregados acumulados por un trigger al insertar)
+- percentiles del equipo para una métrica
+
+Uso:
+    with AlmacenMetricas() as almacen:
+        almacen.registrar_salto(metrics, atleta='atleta_001', tipo_sesion='entrenamiento')
+        historial = almacen.historial_atleta('atleta_001')
+        p = almacen.percentiles_equipo('altura_salto_cm', tipo_sesion='evaluacion')
+"""
+import glob
+import math
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime
+
+import pandas as pd
+
+RUTA_POR_DEFECTO = "jump_metrics.db"
+ATLETA_DESCONOCIDO = "desconocido"
+SESION_DESCONOCIDA = "sin_tipo"
+
+# Columna en la base de datos -> clave en el diccionario de calculate_advanced_metrics
+COLUMNAS_METRICAS = {
+    'altura_salto_cm': 'jump_height_cm',
+    'tiempo_vuelo_s': 'flight_time',
+    'velocidad_despegue_ms': 'takeoff_velocity',
+    'angulo_rodillas_despegue': 'avg_knee_angle_takeoff',
+    'angulo_caderas_despegue': 'avg_hip_angle_takeoff',
+    'asimetria_rodillas': 'knee_asymmetry',
+    'asimetria_caderas': 'hip_asymmetry',
+    'simetria_general_pct': 'overall_symmetry',
+    'potencia_estimada_w': 'power_estimate',
+}
+
+# Métricas con índice propio (y por tipo de sesión) para calcular percentiles
+# recorriendo el índice en lugar de ordenar la tabla
+METRICAS_INDEXADAS = ('altura_salto_cm', 'tiempo_vuelo_s', 'potencia_estimada_w',
+                      'simetria_general_pct')
+
+# Nombre de los CSV de la interfaz de adquisición: <atleta>_<tipo_sesion>_visual_<AAAAMMDD_HHMMSS>.csv
+PATRON_ARCHIVO_SESION = re.compile(
+    r'^(?P<atleta>.+)_(?P<tipo_sesion>[^_]+)_visual_(?P<fecha>\d{8}_\d{6})\.csv$')
+# Nombre de los CSV del prototipo en vivo: jump_analysis_<epoch>.csv (solo identifica la fecha)
+PATRON_ARCHIVO_PROTOTIPO = re.compile(r'^jump_analysis_(?P<epoch>\d+)\.csv$')
+
+
+def identificar_sesion(ruta_archivo):
+    """
+    Obtiene atleta, tipo de sesión y fecha a partir del nombre del CSV
+    Returns:
+        (atleta, tipo_sesion, fecha_epoch); None en los campos que no se pueden deducir
+    """
+    nombre = os.path.basename(str(ruta_archivo))
+    coincidencia = PATRON_ARCHIVO_PROTOTIPO.match(nombre)
+    if coincidencia is not None:
+        return None, None, float(coincidencia['epoch'])
+    coincidencia = PATRON_ARCHIVO_SESION.match(nombre)
+    if coincidencia is None:
+        return None, None, None
+    fecha = datetime.strptime(coincidencia['fecha'], "%Y%m%d_%H%M%S").timestamp()
+    return coincidencia['atleta'], coincidencia['tipo_sesion'], fecha
+
+
+class AlmacenMetricas:
+    """Base de datos SQLite de solo inserción con las métricas de cada salto analizado"""
+
+    def __init__(self, ruta=RUTA_POR_DEFECTO):
+        """
+        Args:
+            ruta: Archivo de la base de datos (se crea si no existe)
+        """
+        self.ruta = ruta
+        self.conexion = sqlite3.connect(ruta)
+        # WAL permite leer mientras otro proceso agrega análisis
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        self._crear_esquema()
+
+    def _crear_esquema(self):
+        columnas = ",\n".join(f"    {c} REAL" for c in COLUMNAS_METRICAS)
+        indices_metricas = "\n".join(
+            f"CREATE INDEX IF NOT EXISTS idx_saltos_{c} ON saltos({c});\n"
+            f"CREATE INDEX IF NOT EXISTS idx_saltos_sesion_{c} ON saltos(tipo_sesion, {c});"
+            for c in METRICAS_INDEXADAS)
+        # Agregados por (tipo de sesión, atleta): suma y cantidad de valores no nulos de cada métrica
+        columnas_resumen = ",\n".join(
+            f"    suma_{c} REAL NOT NULL DEFAULT 0,\n    cuenta_{c} INTEGER NOT NULL DEFAULT 0"
+            for c in METRICAS_INDEXADAS)
+        acumular = ",\n    ".join(
+            f"suma_{c} = suma_{c} + COALESCE(NEW.{c}, 0), cuenta_{c} = cuenta_{c} + (NEW.{c} IS NOT NULL)"
+            for c in METRICAS_INDEXADAS)
+        resumen_existente = self.conexion.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'resumen_sesiones'").fetchone()
+        with self.conexion:
+            self.conexion.executescript(f"""
+CREATE TABLE IF NOT EXISTS saltos (
+    id INTEGER PRIMARY KEY,
+    fecha REAL NOT NULL,
+    atleta TEXT NOT NULL,
+    tipo_sesion TEXT NOT NULL,
+    archivo_origen TEXT,
+    tipo_salto TEXT,
+{columnas}
+);
+-- Un mismo CSV solo se registra una vez (las filas sin archivo no se restringen)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_saltos_archivo ON saltos(archivo_origen);
+CREATE INDEX IF NOT EXISTS idx_saltos_atleta_fecha ON saltos(atleta, fecha);
+CREATE INDEX IF NOT EXISTS idx_saltos_sesion_fecha ON saltos(tipo_sesion, fecha);
+{indices_metricas}
+CREATE TRIGGER IF NOT EXISTS saltos_sin_modificar BEFORE UPDATE ON saltos
+BEGIN SELECT RAISE(ABORT, 'El almacén de métricas es de solo inserción'); END;
+CREATE TRIGGER IF NOT EXISTS saltos_sin_borrar BEFORE DELETE ON saltos
+BEGIN SELECT RAISE(ABORT, 'El almacén de métricas es de solo inserción'); END;
+CREATE TABLE IF NOT EXISTS resumen_sesiones (
+    tipo_sesion TEXT NOT NULL,
+    atleta TEXT NOT NULL,
+    num_saltos INTEGER NOT NULL DEFAULT 0,
+    altura_maxima_cm REAL,
+{columnas_resumen},
+    PRIMARY KEY (tipo_sesion, atleta)
+);
+CREATE TRIGGER IF NOT EXISTS saltos_acumular_resumen AFTER INSERT ON saltos
+BEGIN
+INSERT OR IGNORE INTO resumen_sesiones (tipo_sesion, atleta) VALUES (NEW.tipo_sesion, NEW.atleta);
+UPDATE resumen_sesiones SET
+    num_saltos = num_saltos + 1,
+    altura_maxima_cm = CASE WHEN altura_maxima_cm IS NULL OR NEW.altura_salto_cm > altura_maxima_cm
+                            THEN COALESCE(NEW.altura_salto_cm, altura_maxima_cm)
+                            ELSE altura_maxima_cm END,
+    {acumular}
+WHERE tipo_sesion = NEW.tipo_sesion AND atleta = NEW.atleta;
+END;
+""")
+            if not resumen_existente:
+                # Base creada por una versión sin agregados: se calculan una vez desde los saltos
+                sumas = ", ".join(f"TOTAL({c}), COUNT({c})" for c in METRICAS_INDEXADAS)
+                campos = ", ".join(f"suma_{c}, cuenta_{c}" for c in METRICAS_INDEXADAS)
+                self.conexion.execute(
+                    f"INSERT INTO resumen_sesiones (tipo_sesion, atleta, num_saltos, altura_maxima_cm, {campos}) "
+                    f"SELECT tipo_sesion, atleta, COUNT(*), MAX(altura_salto_cm), {sumas} "
+                    f"FROM saltos GROUP BY tipo_sesion, atleta")
+
+    def registrar_salto(self, metrics, atleta=None, tipo_sesion=None, archivo_origen=None,
+                        tipo_salto=None, fecha=None):
+        """
+        Agrega las métricas de un salto
+        Si el archivo de origen ya está registrado no se inserta de nuevo.
+        Args:
+            metrics: Diccionario de JumpDataAnalyzer.calculate_advanced_metrics
+            atleta: Identificador del atleta
+            tipo_sesion: Entrenamiento, competencia, evaluación, rehabilitación...
+            archivo_origen: CSV del que salen las métricas
+            tipo_salto: Clasificación de la técnica (opcional)
+            fecha: Momento de la sesión (epoch en s); por defecto el actual
+        Returns:
+            id de la fila insertada, o None si el archivo ya estaba registrado
+        """
+        fila = {
+            'fecha': time.time() if fecha is None else fecha,
+            'atleta': atleta or ATLETA_DESCONOCIDO,
+            'tipo_sesion': tipo_sesion or SESION_DESCONOCIDA,
+            'archivo_origen': _normalizar_archivo(archivo_origen),
+            'tipo_salto': tipo_salto,
+        }
+        for columna, clave in COLUMNAS_METRICAS.items():
+            valor = metrics.get(clave)
+            fila[columna] = None if valor is None else float(valor)
+
+        campos = ", ".join(fila)
+        marcadores = ", ".join(f":{c}" for c in fila)
+        with self.conexion:
+            cursor = self.conexion.execute(
+                f"INSERT OR IGNORE INTO saltos ({campos}) VALUES ({marcadores})", fila)
+        return cursor.lastrowid if cursor.rowcount else None
+
+    def importar_resumenes_csv(self, patron="jump_summary_*.csv"):
+        """
+        Migra los resúmenes CSV de una fila generados por versiones anteriores
+        Los archivos de origen ya registrados se omiten, así importar dos veces no duplica filas.
+        Returns:
+            Número de filas importadas
+        """
+        filas = []
+        for archivo in sorted(glob.glob(patron)):
+            resumen = pd.read_csv(archivo)
+            for _, r in resumen.iterrows():
+                atleta, tipo_sesion, fecha = identificar_sesion(r.get('archivo_origen', ''))
+                fila = {
+                    'fecha': fecha or _a_epoch(r['timestamp']),
+                    'atleta': atleta or ATLETA_DESCONOCIDO,
+                    'tipo_sesion': tipo_sesion or SESION_DESCONOCIDA,
+                    'archivo_origen': _normalizar_archivo(r.get('archivo_origen')),
+                    'tipo_salto': None,
+                }
+                fila.update({c: r.get(c) for c in COLUMNAS_METRICAS})
+                filas.append(fila)
+
+        if not filas:
+            return 0
+        campos = list(filas[0])
+        cambios_previos = self.conexion.total_changes
+        with self.conexion:
+            self.conexion.executemany(
+                f"INSERT OR IGNORE INTO saltos ({', '.join(campos)}) "
+                f"VALUES ({', '.join(':' + c for c in campos)})", filas)
+        return self.conexion.total_changes - cambios_previos
+
+    def historial_atleta(self, atleta, desde=None, hasta=None, tipo_sesion=None):
+        """
+        Saltos de un atleta ordenados por fecha (usa el índice atleta, fecha)
+        Args:
+            desde, hasta: Límites de fecha (epoch en s o datetime); None = sin límite
+            tipo_sesion: Filtra por tipo de sesión
+        Returns:
+            DataFrame con una fila por salto y la columna 'fecha' como datetime
+        """
+        condiciones, parametros = ["atleta = ?"], [atleta]
+        if desde is not None:
+            condiciones.append("fecha >= ?")
+            parametros.append(_a_epoch(desde))
+        if hasta is not None:
+            condiciones.append("fecha <= ?")
+            parametros.append(_a_epoch(hasta))
+        if tipo_sesion is not None:
+            condiciones.append("tipo_sesion = ?")
+            parametros.append(tipo_sesion)
+
+        df = pd.read_sql_query(
+            f"SELECT * FROM saltos WHERE {' AND '.join(condiciones)} ORDER BY fecha",
+            self.conexion, params=parametros)
+        df['fecha'] = df['fecha'].map(datetime.fromtimestamp)
+        return df
+
+    def resumen_por_tipo_sesion(self, atleta=None):
+        """
+        Cantidad de saltos y promedios de las métricas principales por tipo de sesión
+        Se lee de la tabla de agregados (una fila por tipo de sesión y atleta),
+        sin recorrer los saltos.
+        Args:
+            atleta: Si se indica, el resumen se limita a ese atleta
+        """
+        agregados = ", ".join(
+            f"SUM(suma_{c}) / NULLIF(SUM(cuenta_{c}), 0) AS {c}_promedio" for c in METRICAS_INDEXADAS)
+        filtro, parametros = ("WHERE atleta = ?", [atleta]) if atleta is not None else ("", [])
+        return pd.read_sql_query(
+            f"SELECT tipo_sesion, SUM(num_saltos) AS num_saltos, COUNT(*) AS num_atletas, "
+            f"MAX(altura_maxima_cm) AS altura_maxima_cm, {agregados} "
+            f"FROM resumen_sesiones {filtro} GROUP BY tipo_sesion ORDER BY tipo_sesion",
+            self.conexion, params=parametros)
+
+    def percentiles_equipo(self, metrica='altura_salto_cm', percentiles=(10, 25, 50, 75, 90),
+                           tipo_sesion=None):
+        """
+        Percentiles de una métrica sobre todos los saltos del equipo
+        Cada percentil se lee directamente del índice de la métrica con
+        LIMIT/OFFSET, sin cargar ni ordenar la tabla.
+        Args:
+            metrica: Una de METRICAS_INDEXADAS
+            percentiles: Percentiles a calcular (0-100)
+            tipo_sesion: Limita el cálculo a un tipo de sesión
+        Returns:
+            Diccionario {percentil: valor} (interpolación lineal, como np.percentile)
+        """
+        _validar_metrica(metrica)
+        filtro, parametros = f"WHERE {metrica} IS NOT NULL", []
+        if tipo_sesion is not None:
+            filtro += " AND tipo_sesion = ?"
+            parametros.append(tipo_sesion)
+
+        total = self.conexion.execute(
+            f"SELECT COUNT({metrica}) FROM saltos {filtro}", parametros).fetchone()[0]
+        if total == 0:
+            return {p: None for p in percentiles}
+
+        resultado = {}
+        for p in percentiles:
+            posicion = (total - 1) * p / 100
+            inferior = math.floor(posicion)
+            valores = [v for (v,) in self.conexion.execute(
+                f"SELECT {metrica} FROM saltos {filtro} ORDER BY {metrica} LIMIT 2 OFFSET ?",
+                parametros + [inferior])]
+            if len(valores) == 1:
+                resultado[p] = valores[0]
+            else:
+                resultado[p] = valores[0] + (valores[1] - valores[0]) * (posicion - inferior)
+        return resultado
+
+    def percentil_en_equipo(self, valor, metrica='altura_salto_cm', tipo_sesion=None):
+        """
+        Porcentaje de saltos del equipo por debajo de un valor (p. ej. el último salto de un atleta)
+        Usa un conteo por rango sobre el índice de la métrica.
+        """
+        _validar_metrica(metrica)
+        filtro, parametros = f"WHERE {metrica} IS NOT NULL", []
+        if tipo_sesion is not None:
+            filtro += " AND tipo_sesion = ?"
+            parametros.append(tipo_sesion)
+
+        total = self.conexion.execute(
+            f"SELECT COUNT(*) FROM saltos {filtro}", parametros).fetchone()[0]
+        if total == 0:
+            return None
+        debajo = self.conexion.execute(
+            f"SELECT COUNT(*) FROM saltos {filtro} AND {metrica} < ?",
+            parametros + [valor]).fetchone()[0]
+        return 100.0 * debajo / total
+
+    def contar_saltos(self):
+        """Número total de saltos registrados"""
+        return self.conexion.execute("SELECT COUNT(*) FROM saltos").fetchone()[0]
+
+    def cerrar(self):
+        """Cierra la conexión con la base de datos"""
+        self.conexion.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.cerrar()
+
+
+def _validar_metrica(metrica):
+    # El nombre de la columna se interpola en el SQL: solo se aceptan métricas conocidas
+    if metrica not in METRICAS_INDEXADAS:
+        raise ValueError(f"Métrica no indexada: {metrica}. Opciones: {METRICAS_INDEXADAS}")
+
+
+def _normalizar_archivo(ruta):
+    # './x.csv' y 'x.csv' deben contar como el mismo archivo para evitar duplicados
+    if ruta is None or (isinstance(ruta, float) and math.isnan(ruta)):
+        return None
+    return os.path.normpath(str(ruta))
+
+
+def _a_epoch(fecha):
+    """Convierte datetime, Timestamp, texto de fecha o epoch a segundos epoch (hora local)"""
+    if isinstance(fecha, (int, float)):
+        return float(fecha)
+    return pd.Timestamp(fecha).to_pydatetime().timestamp()
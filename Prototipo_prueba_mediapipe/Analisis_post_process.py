@@ -1,18 +1,48 @@
+import time
+_inicio_modulo = time.perf_counter()
+
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy import signal
-from scipy.stats import pearsonr
+import importlib
+import sys
 import os
 import glob
 
+from Acondicionamiento_senal import (cargar_csv, columnas_landmarks, remuestrear_uniforme,
+                                     filtrar_matriz, derivar_matriz, interpolar_matriz,
+                                     elegir_corte, CORTE_COM_HZ, CORTE_LANDMARKS_HZ)
+from Almacen_metricas import AlmacenMetricas, identificar_sesion, RUTA_POR_DEFECTO
+
+# Tiempos de importación (s). matplotlib, seaborn y scipy solo se importan
+# cuando se generan gráficos o se filtran datos, así un análisis de métricas
+# arranca sin cargar las librerías de graficación.
+TIEMPOS_ARRANQUE = {}
+
+
+def _importar(nombre):
+    """Importa un módulo en su primer uso y guarda el tiempo que tomó"""
+    if nombre not in sys.modules:
+        inicio = time.perf_counter()
+        importlib.import_module(nombre)
+        TIEMPOS_ARRANQUE[f"import {nombre}"] = time.perf_counter() - inicio
+    return sys.modules[nombre]
+
+
+def reportar_tiempos_arranque():
+    """Imprime los tiempos de importación y arranque registrados"""
+    print("\n⏱️  TIEMPOS DE ARRANQUE:")
+    for nombre, segundos in TIEMPOS_ARRANQUE.items():
+        print(f"   {nombre}: {segundos:.3f} s")
+
 class JumpDataAnalyzer:
-    def __init__(self, csv_file=None):
+    def __init__(self, csv_file=None, athlete_id=None, session_type=None):
         """
         Inicializa el analizador de datos
         Args:
             csv_file: Ruta al archivo CSV. Si es None, busca el más reciente.
+            athlete_id: Atleta al que se asignan las métricas en el almacén.
+                        Si es None se deduce del nombre del archivo cuando es posible.
+            session_type: Tipo de sesión (entrenamiento, competencia...). Igual que athlete_id.
         """
         if csv_file is None:
             # Buscar el archivo CSV más reciente
@@ -22,36 +52,92 @@ class JumpDataAnalyzer:
             csv_file = max(csv_files, key=os.path.getctime)
             print(f"Usando archivo: {csv_file}")
         
-        self.data = pd.read_csv(csv_file)
+        self.data = cargar_csv(csv_file)
         self.filename = csv_file
         
-        # Configurar estilo de gráficos
-        plt.style.use('seaborn-v0_8')
-        sns.set_palette("husl")
+        # Identificación de la sesión para el almacén de métricas
+        file_athlete, file_session, self.session_date = identificar_sesion(csv_file)
+        self.athlete_id = athlete_id or file_athlete
+        self.session_type = session_type or file_session
+        
+        # Frecuencia de muestreo estimada en filter_data / filter_landmarks
+        self.sampling_rate = None
+        self.landmark_signals = None
+        
+        # El estilo de gráficos se aplica en el primer gráfico (ver _preparar_graficos)
+        self._estilo_aplicado = False
     
-    def filter_data(self, cutoff_freq=10, sampling_rate=30):
+    def _preparar_graficos(self):
+        """Importa matplotlib/seaborn y aplica el estilo solo cuando se va a graficar"""
+        plt = _importar('matplotlib.pyplot')
+        if not self._estilo_aplicado:
+            sns = _importar('seaborn')
+            # Configurar estilo de gráficos
+            plt.style.use('seaborn-v0_8')
+            sns.set_palette("husl")
+            self._estilo_aplicado = True
+        return plt
+    
+    def filter_data(self, cutoff_freq=None, sampling_rate=None):
         """
         Aplica filtro pasa-bajas para suavizar los datos
         Args:
-            cutoff_freq: Frecuencia de corte en Hz
-            sampling_rate: Frecuencia de muestreo en Hz
+            cutoff_freq: Frecuencia de corte en Hz (se limita por debajo de Nyquist).
+                         Si es None se usan 10 Hz o menos si el muestreo estimado no lo permite
+            sampling_rate: Frecuencia de muestreo en Hz. Si es None se estima de los timestamps
         """
-        nyquist = sampling_rate / 2
-        normal_cutoff = cutoff_freq / nyquist
-        b, a = signal.butter(2, normal_cutoff, btype='low', analog=False)
-        
-        # Filtrar posición del centro de masa
-        self.data['com_y_filtered'] = signal.filtfilt(b, a, self.data['com_y'])
-        self.data['com_x_filtered'] = signal.filtfilt(b, a, self.data['com_x'])
+        timestamps = self.data['timestamp'].values
+        com = self.data[['com_y', 'com_x']].values
+        
+        # Remuestrear a una grilla uniforme y filtrar ambos canales en una sola llamada
+        t_uniforme, com_uniforme, self.sampling_rate = remuestrear_uniforme(
+            timestamps, com, sampling_rate)
+        if cutoff_freq is None:
+            cutoff_freq = elegir_corte(CORTE_COM_HZ, self.sampling_rate)
+        com_filtrado = filtrar_matriz(com_uniforme, cutoff_freq, self.sampling_rate)
+        
+        # Velocidad vertical (derivada numérica sobre la grilla uniforme)
+        velocidad_y = derivar_matriz(com_filtrado[:, :1], self.sampling_rate)
+        
+        # Volver a los timestamps originales para conservar una fila por frame
+        resultado = interpolar_matriz(t_uniforme, np.hstack([com_filtrado, velocidad_y]),
+                                      timestamps)
+        self.data['com_y_filtered'] = resultado[:, 0]
+        self.data['com_x_filtered'] = resultado[:, 1]
+        self.data['vertical_velocity'] = resultado[:, 2]
+        
+        print(f"Datos filtrados exitosamente (muestreo estimado: {self.sampling_rate:.1f} Hz)")
+    
+    def filter_landmarks(self, cutoff_freq=None, sampling_rate=None):
+        """
+        Filtra y deriva todos los canales de landmarks (landmark_<i>_x/y/z) a la vez
+        Args:
+            cutoff_freq: Frecuencia de corte en Hz (se limita por debajo de Nyquist).
+                         Si es None se usan 6 Hz o menos si el muestreo estimado no lo permite
+            sampling_rate: Frecuencia de la grilla uniforme. Si es None se estima de los timestamps
+        Returns:
+            DataFrame sobre la grilla uniforme con posición filtrada y velocidad
+            (<columna>_vel) de cada canal, o None si el CSV no tiene landmarks
+        """
+        columnas = columnas_landmarks(self.data.columns)
+        if not columnas:
+            print("El archivo no contiene columnas de landmarks")
+            return None
         
-        # Calcular velocidad vertical (derivada numérica)
-        dt = np.diff(self.data['timestamp'].values)
-        dt = np.append(dt, dt[-1])  # Mantener la misma longitud
+        t_uniforme, uniforme, self.sampling_rate = remuestrear_uniforme(
+            self.data['timestamp'].values, self.data[columnas].values, sampling_rate)
+        if cutoff_freq is None:
+            cutoff_freq = elegir_corte(CORTE_LANDMARKS_HZ, self.sampling_rate)
+        posicion = filtrar_matriz(uniforme, cutoff_freq, self.sampling_rate)
+        velocidad = derivar_matriz(posicion, self.sampling_rate)
         
-        self.data['vertical_velocity'] = np.gradient(self.data['com_y_filtered'], 
-                                                   self.data['timestamp'])
+        self.landmark_signals = pd.DataFrame(
+            np.hstack([t_uniforme[:, None], posicion, velocidad]),
+            columns=['timestamp'] + columnas + [f"{c}_vel" for c in columnas])
         
-        print("Datos filtrados exitosamente")
+        print(f"{len(columnas)} canales de landmarks filtrados "
+              f"({len(t_uniforme)} muestras a {self.sampling_rate:.1f} Hz)")
+        return self.landmark_signals
     
     def detect_jump_events(self, velocity_threshold=0.05):
         """
@@ -154,6 +240,8 @@ class JumpDataAnalyzer:
             print("No se pueden generar gráficos sin datos de salto válidos")
             return
         
+        plt = self._preparar_graficos()
+        
         # Crear figura con subplots
         fig = plt.figure(figsize=(16, 12))
         
@@ -294,19 +382,58 @@ class JumpDataAnalyzer:
         summary_df.to_csv(summary_filename, index=False)
         print(f"Resumen exportado como: {summary_filename}")
     
-    def compare_multiple_jumps(self, csv_files_list):
+    def store_metrics(self, metrics, classification=None, db_path=RUTA_POR_DEFECTO):
+        """
+        Agrega las métricas al almacén consolidado (una fila por salto)
+        Args:
+            metrics: Métricas de calculate_advanced_metrics
+            classification: Resultado de analyze_technique_classification (opcional)
+            db_path: Base de datos SQLite del almacén
+        Returns:
+            Percentil de la altura de este salto dentro del equipo
+        """
+        if metrics is None:
+            print("No hay métricas para registrar")
+            return None
+        
+        with AlmacenMetricas(db_path) as almacen:
+            fila_id = almacen.registrar_salto(
+                metrics,
+                atleta=self.athlete_id,
+                tipo_sesion=self.session_type,
+                archivo_origen=self.filename,
+                tipo_salto=classification['tipo_salto'] if classification else None,
+                fecha=self.session_date)
+            percentile = almacen.percentil_en_equipo(metrics['jump_height_cm'])
+            total = almacen.contar_saltos()
+        
+        if fila_id is None:
+            print(f"{self.filename} ya estaba registrado en: {db_path} ({total} saltos en total)")
+        else:
+            print(f"Métricas registradas en: {db_path} ({total} saltos en total)")
+        return percentile
+    
+    def compare_multiple_jumps(self, csv_files_list, export_csv=False, db_path=RUTA_POR_DEFECTO):
         """
         Compara múltiples saltos para análisis de progresión
         Args:
             csv_files_list: Lista de archivos CSV para comparar
+            export_csv: Si es True también exporta la tabla de comparación a CSV
+                        (las métricas de cada salto se registran en el almacén)
+            db_path: Almacén SQLite donde se registran los saltos comparados
         """
         all_metrics = []
         
         for file in csv_files_list:
             try:
                 temp_analyzer = JumpDataAnalyzer(file)
+                # Si el nombre del archivo no identifica la sesión se usa la de este análisis
+                temp_analyzer.athlete_id = temp_analyzer.athlete_id or self.athlete_id
+                temp_analyzer.session_type = temp_analyzer.session_type or self.session_type
                 metrics = temp_analyzer.calculate_advanced_metrics()
                 if metrics:
+                    # Los archivos ya registrados no se duplican en el almacén
+                    temp_analyzer.store_metrics(metrics, db_path=db_path)
                     metrics['filename'] = file
                     all_metrics.append(metrics)
             except Exception as e:
@@ -319,6 +446,8 @@ class JumpDataAnalyzer:
         # Crear DataFrame para comparación
         comparison_df = pd.DataFrame(all_metrics)
         
+        plt = self._preparar_graficos()
+        
         # Gráfico de comparación
         fig, axes = plt.subplots(2, 2, figsize=(15, 10))
         
@@ -355,9 +484,10 @@ class JumpDataAnalyzer:
         plt.show()
         
         # Exportar datos de comparación
-        comparison_csv = f"jump_comparison_{int(pd.Timestamp.now().timestamp())}.csv"
-        comparison_df.to_csv(comparison_csv, index=False)
-        print(f"Datos de comparación exportados como: {comparison_csv}")
+        if export_csv:
+            comparison_csv = f"jump_comparison_{int(pd.Timestamp.now().timestamp())}.csv"
+            comparison_df.to_csv(comparison_csv, index=False)
+            print(f"Datos de comparación exportados como: {comparison_csv}")
         
         return comparison_df
     
@@ -435,8 +565,14 @@ class JumpDataAnalyzer:
         
         return recommendations
     
-    def run_complete_analysis(self):
-        """Ejecuta un análisis completo y genera todos los reportes"""
+    def run_complete_analysis(self, generate_plots=True, db_path=RUTA_POR_DEFECTO):
+        """
+        Ejecuta un análisis completo y genera todos los reportes
+        Args:
+            generate_plots: Si es False solo calcula y registra métricas,
+                            sin importar matplotlib ni generar el reporte visual
+            db_path: Almacén SQLite donde se agregan las métricas del salto
+        """
         print("="*60)
         print("ANÁLISIS BIOMECÁNICO COMPLETO DE SALTO")
         print("="*60)
@@ -471,9 +607,12 @@ class JumpDataAnalyzer:
             print(f"   {rec}")
         
         # Generar reportes
-        print(f"\n📈 Generando reportes visuales...")
-        self.create_comprehensive_report()
-        self.export_summary_csv(metrics)
+        if generate_plots:
+            print(f"\n📈 Generando reportes visuales...")
+            self.create_comprehensive_report()
+        percentile = self.store_metrics(metrics, classification, db_path)
+        if percentile is not None:
+            print(f"   Percentil de altura en el equipo: {percentile:.0f}")
         
         print(f"\n✅ Análisis completado exitosamente!")
         
@@ -481,16 +620,45 @@ class JumpDataAnalyzer:
 
 # Función principal para ejecutar el análisis
 def main():
-    """Función principal para ejecutar el análisis de datos"""
+    """
+    Función principal para ejecutar el análisis de datos
+    Opciones:
+        --solo-metricas: Calcula métricas sin generar gráficos (arranque rápido)
+        --tiempos: Muestra los tiempos de importación y arranque
+        --atleta, --tipo-sesion: Identifican la sesión en el almacén de métricas
+    """
+    import argparse
+    TIEMPOS_ARRANQUE['carga del módulo'] = time.perf_counter() - _inicio_modulo
+    
+    parser = argparse.ArgumentParser(description="Análisis post-procesamiento de saltos")
+    parser.add_argument('--solo-metricas', action='store_true',
+                        help="Calcula y registra métricas sin generar gráficos")
+    parser.add_argument('--tiempos', action='store_true',
+                        help="Muestra los tiempos de importación y arranque")
+    parser.add_argument('--atleta', default=None,
+                        help="Atleta al que se asigna el salto en el almacén")
+    parser.add_argument('--tipo-sesion', default=None,
+                        help="Tipo de sesión (entrenamiento, competencia, evaluacion...)")
+    args = parser.parse_args()
+    solo_metricas = args.solo_metricas
+    
     print("Sistema de Análisis Post-Procesamiento de Saltos")
     print("=" * 50)
     
     try:
         # Crear analizador (busca automáticamente el archivo más reciente)
-        analyzer = JumpDataAnalyzer()
+        analyzer = JumpDataAnalyzer(athlete_id=args.atleta, session_type=args.tipo_sesion)
         
         # Ejecutar análisis completo
-        results = analyzer.run_complete_analysis()
+        inicio = time.perf_counter()
+        results = analyzer.run_complete_analysis(generate_plots=not solo_metricas)
+        TIEMPOS_ARRANQUE['análisis completo'] = time.perf_counter() - inicio
+        
+        if args.tiempos:
+            reportar_tiempos_arranque()
+        
+        if solo_metricas:
+            return
         
         # Preguntar si desea comparar con otros archivos
         response = input("\n¿Desea comparar con otros archivos de salto? (s/n): ")
@@ -0,0 +1,290 @@
+"""
+Backends de inferencia de pose intercambiables
+
+- 'soluciones': API clásica mp.solutions.pose.Pose (síncrona). Cada frame
+  bloquea el bucle durante toda la inferencia.
+- 'tareas': MediaPipe Tasks PoseLandmarker en modo LIVE_STREAM. detect_async
+  retorna de inmediato y el resultado llega por callback, así mientras un
+  frame está en inferencia el bucle analiza el resultado anterior y captura
+  el siguiente. El rendimiento queda limitado por la etapa más lenta y no
+  por la suma de todas.
+
+Ambos backends entregan resultados con la misma forma que la API clásica
+(results.pose_landmarks.landmark[i].x/y/z/visibility), de modo que el
+análisis y mp_drawing.draw_landmarks no cambian.
+
+El backend 'tareas' necesita el modelo .task de PoseLandmarker:
+    https://storage.googleapis.com/mediapipe-models/pose_landmarker/pose_landmarker_full/float16/latest/pose_landmarker_full.task
+
+También lo usa la interfaz de Simulacion_Adq_visual, que agrega esta carpeta
+al path al arrancar.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+
+BACKEND_SOLUCIONES = 'soluciones'
+BACKEND_TAREAS = 'tareas'
+BACKENDS = (BACKEND_SOLUCIONES, BACKEND_TAREAS)
+
+RUTA_MODELO_POR_DEFECTO = 'pose_landmarker_full.task'
+URL_MODELO = ('https://storage.googleapis.com/mediapipe-models/pose_landmarker/'
+              'pose_landmarker_full/float16/latest/pose_landmarker_full.task')
+
+
+class ResultadoPose:
+    """Resultado con la misma interfaz que el de mp.solutions.pose"""
+    __slots__ = ('pose_landmarks',)
+
+    def __init__(self, pose_landmarks=None):
+        self.pose_landmarks = pose_landmarks
+
+
+class BackendSoluciones:
+    """Backend síncrono con mp.solutions.pose.Pose"""
+    asincrono = False
+
+    def __init__(self, model_complexity=1, min_detection_confidence=0.5,
+                 min_tracking_confidence=0.5, pose=None):
+        """
+        Args:
+            pose: Modelo Pose ya creado (p. ej. precargado en segundo plano); si es None se crea
+        """
+        if pose is None:
+            import mediapipe as mp
+            pose = mp.solutions.pose.Pose(
+                static_image_mode=False,
+                model_complexity=model_complexity,
+                enable_segmentation=False,
+                min_detection_confidence=min_detection_confidence,
+                min_tracking_confidence=min_tracking_confidence
+            )
+        self.pose = pose
+        self._listos = []
+
+    def procesar(self, frame_bgr, t=None):
+        """Inferencia síncrona de un frame BGR"""
+        rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+        rgb.flags.writeable = False
+        return self.pose.process(rgb)
+
+    def enviar(self, frame_bgr, t):
+        """Procesa el frame en el acto; el resultado queda listo para obtener_resultados"""
+        self._listos.append((frame_bgr, t, self.procesar(frame_bgr)))
+
+    def ocupado(self):
+        return False
+
+    def obtener_resultados(self):
+        """Lista de (frame, t, resultado) en orden de envío"""
+        listos, self._listos = self._listos, []
+        return listos
+
+    def descartar_pendientes(self):
+        """Olvida los resultados no leídos (p. ej. al detener una grabación)"""
+        self._listos = []
+
+    def cerrar(self):
+        self.pose.close()
+
+
+class BackendTareasLiveStream:
+    """Backend asíncrono con PoseLandmarker (MediaPipe Tasks) en modo LIVE_STREAM"""
+    asincrono = True
+
+    def __init__(self, ruta_modelo=None, min_detection_confidence=0.5, min_presence_confidence=0.5,
+                 min_tracking_confidence=0.5, max_en_vuelo=2):
+        """
+        Args:
+            ruta_modelo: Archivo .task de PoseLandmarker (por defecto pose_landmarker_full.task)
+            max_en_vuelo: Frames enviados sin resultado a partir de los cuales ocupado() es True
+        """
+        import mediapipe as mp
+        from mediapipe.tasks.python import BaseOptions
+        from mediapipe.tasks.python import vision
+        from mediapipe.framework.formats import landmark_pb2
+
+        ruta_modelo = ruta_modelo or RUTA_MODELO_POR_DEFECTO
+        if not os.path.exists(ruta_modelo):
+            raise FileNotFoundError(
+                f"No se encontró el modelo {ruta_modelo}. Descárgalo desde {URL_MODELO}")
+
+        self._mp = mp
+        self._landmark_pb2 = landmark_pb2
+        self.max_en_vuelo = max_en_vuelo
+        # Frames enviados (por timestamp en ms, en orden) y resultados recibidos por callback
+        self._pendientes = OrderedDict()
+        self._recibidos = {}
+        self._condicion = threading.Condition()
+        self._ultimo_ts_ms = -1
+        # Frames que MediaPipe descartó por estar ocupado (no reciben callback)
+        self.descartados = 0
+
+        opciones = vision.PoseLandmarkerOptions(
+            base_options=BaseOptions(model_asset_path=ruta_modelo),
+            running_mode=vision.RunningMode.LIVE_STREAM,
+            num_poses=1,
+            min_pose_detection_confidence=min_detection_confidence,
+            min_pose_presence_confidence=min_presence_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            result_callback=self._al_recibir_resultado
+        )
+        self.landmarker = vision.PoseLandmarker.create_from_options(opciones)
+
+    def _al_recibir_resultado(self, resultado, imagen, ts_ms):
+        # Corre en el hilo de MediaPipe: solo se guarda, el análisis va en el hilo principal
+        with self._condicion:
+            self._recibidos[ts_ms] = resultado
+            self._condicion.notify_all()
+
+    def enviar(self, frame_bgr, t):
+        """
+        Envía un frame a inferencia sin esperar el resultado
+        Args:
+            frame_bgr: Frame de la cámara
+            t: Tiempo de captura en segundos (reloj monótono)
+        """
+        # detect_async exige timestamps estrictamente crecientes en ms
+        ts_ms = max(int(t * 1000), self._ultimo_ts_ms + 1)
+        self._ultimo_ts_ms = ts_ms
+        rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+        imagen = self._mp.Image(image_format=self._mp.ImageFormat.SRGB, data=rgb)
+        with self._condicion:
+            self._pendientes[ts_ms] = (frame_bgr, t)
+        self.landmarker.detect_async(imagen, ts_ms)
+        return ts_ms
+
+    def ocupado(self):
+        """True si ya hay max_en_vuelo frames esperando resultado"""
+        with self._condicion:
+            return len(self._pendientes) >= self.max_en_vuelo
+
+    def obtener_resultados(self):
+        """
+        Resultados disponibles como lista de (frame, t, resultado) en orden de envío
+        Los resultados llegan en orden, así un resultado para ts_ms implica que los
+        frames pendientes anteriores fueron descartados y se eliminan.
+        """
+        listos = []
+        with self._condicion:
+            for ts_ms in sorted(self._recibidos):
+                resultado = self._recibidos.pop(ts_ms)
+                while self._pendientes:
+                    ts_pendiente = next(iter(self._pendientes))
+                    if ts_pendiente > ts_ms:
+                        break
+                    frame, t = self._pendientes.pop(ts_pendiente)
+                    if ts_pendiente == ts_ms:
+                        listos.append((frame, t, resultado))
+                    else:
+                        self.descartados += 1
+        # La conversión se hace fuera del lock y del hilo de MediaPipe
+        return [(frame, t, self._convertir(resultado)) for frame, t, resultado in listos]
+
+    def procesar(self, frame_bgr, t=None, timeout=1.0):
+        """Inferencia síncrona (envía y espera el resultado de ese frame)"""
+        ts_ms = self.enviar(frame_bgr, time.perf_counter() if t is None else t)
+        with self._condicion:
+            self._condicion.wait_for(lambda: ts_ms in self._recibidos, timeout)
+        listos = self.obtener_resultados()
+        with self._condicion:
+            sin_resultado = ts_ms in self._pendientes
+        # El frame enviado es el más reciente: si ya no está pendiente, es el último resultado
+        if sin_resultado or not listos:
+            return ResultadoPose()
+        return listos[-1][2]
+
+    def descartar_pendientes(self):
+        """
+        Olvida los frames en vuelo y los resultados no leídos (p. ej. al detener una grabación)
+        Si después llega el callback de un frame descartado, obtener_resultados lo ignora
+        porque ya no tiene frame pendiente.
+        """
+        with self._condicion:
+            self._pendientes.clear()
+            self._recibidos.clear()
+
+    def _convertir(self, resultado):
+        """Convierte el resultado de Tasks al formato de mp.solutions (NormalizedLandmarkList)"""
+        if not resultado.pose_landmarks:
+            return ResultadoPose()
+        lista = self._landmark_pb2.NormalizedLandmarkList()
+        lista.landmark.extend(
+            self._landmark_pb2.NormalizedLandmark(x=lm.x, y=lm.y, z=lm.z, visibility=lm.visibility or 0.0)
+            for lm in resultado.pose_landmarks[0])
+        return ResultadoPose(lista)
+
+    def cerrar(self):
+        self.landmarker.close()
+
+
+def crear_backend(tipo=BACKEND_SOLUCIONES, ruta_modelo=None, model_complexity=1,
+                  min_detection_confidence=0.5, min_tracking_confidence=0.5, pose=None):
+    """
+    Crea el backend de pose indicado
+    Args:
+        tipo: 'soluciones' (mp.solutions, síncrono) o 'tareas' (PoseLandmarker LIVE_STREAM)
+        ruta_modelo: Archivo .task (solo 'tareas')
+        model_complexity: Complejidad del modelo (solo 'soluciones')
+        pose: Modelo Pose ya cargado a reutilizar (solo 'soluciones')
+    """
+    if tipo == BACKEND_SOLUCIONES:
+        return BackendSoluciones(model_complexity, min_detection_confidence,
+                                 min_tracking_confidence, pose)
+    if tipo == BACKEND_TAREAS:
+        return BackendTareasLiveStream(ruta_modelo, min_detection_confidence,
+                                       min_tracking_confidence=min_tracking_confidence)
+    raise ValueError(f"Backend desconocido: {tipo}. Opciones: {BACKENDS}")
+
+
+class CapturaEnHilo:
+    """
+    Lee la cámara en un hilo propio y conserva solo el frame más reciente
+    Así la captura no espera a la inferencia ni al análisis.
+    """
+
+    def __init__(self, cap):
+        self.cap = cap
+        self._condicion = threading.Condition()
+        self._frame = None
+        self._t = None
+        self._secuencia = 0
+        self._leida = 0
+        self.activa = True
+        self.hilo = threading.Thread(target=self._capturar, daemon=True)
+        self.hilo.start()
+
+    def _capturar(self):
+        while self.activa and self.cap.isOpened():
+            ok, frame = self.cap.read()
+            if not ok:
+                time.sleep(0.01)
+                continue
+            t = time.perf_counter()
+            with self._condicion:
+                self._frame, self._t = frame, t
+                self._secuencia += 1
+                self._condicion.notify_all()
+        with self._condicion:
+            self.activa = False
+            self._condicion.notify_all()
+
+    def leer(self, timeout=1.0):
+        """
+        Espera un frame más nuevo que el último entregado
+        Returns:
+            (ok, frame, t) con t = tiempo de captura (reloj monótono)
+        """
+        with self._condicion:
+            self._condicion.wait_for(lambda: self._secuencia > self._leida or not self.activa, timeout)
+            if self._secuencia == self._leida:
+                return False, None, None
+            self._leida = self._secuencia
+            return True, self._frame, self._t
+
+    def detener(self):
+        self.activa = False
+        self.hilo.join(timeout=1)
@@ -0,0 +1,381 @@
+"""
+Captura concurrente multicámara (vista frontal + lateral)
+
+Cada cámara o archivo de video se procesa en su propio proceso con su
+propio modelo MediaPipe Pose, de modo que dos o tres vistas usan núcleos
+distintos en lugar de repartirse el frame rate de un solo bucle.
+Los procesos envían los landmarks a un coordinador que alinea las vistas
+por timestamp y las registra en una única sesión.
+
+Uso:
+    python Captura_multicamara.py 0 1 --nombres frontal lateral
+    python Captura_multicamara.py frontal.mp4 lateral.mp4 --duracion 10
+"""
+import argparse
+import multiprocessing
+import queue
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+NUM_LANDMARKS = 33
+# x, y, z, visibility por landmark
+CAMPOS_LANDMARK = ('x', 'y', 'z', 'visibility')
+
+
+def _parsear_fuente(fuente):
+    """Convierte '0', '1'... en índices de cámara; el resto se trata como ruta de video"""
+    if isinstance(fuente, str) and fuente.isdigit():
+        return int(fuente)
+    return fuente
+
+
+def proceso_camara(id_vista, fuente, cola_salida, evento_parada, config):
+    """
+    Proceso de captura e inferencia para una sola vista
+    Args:
+        id_vista: Índice de la vista dentro de la sesión
+        fuente: Índice de cámara (int) o ruta a un archivo de video (str)
+        cola_salida: Cola hacia el coordinador
+        evento_parada: Evento compartido para detener la captura
+        config: Diccionario con fps, resolución, complejidad y t_inicio
+    """
+    # Cada proceso importa y crea su propio modelo de pose
+    import mediapipe as mp
+
+    cap = cv2.VideoCapture(fuente)
+    if not cap.isOpened():
+        cola_salida.put(('error', id_vista, f"No se puede abrir la fuente {fuente}"))
+        cola_salida.put(('fin', id_vista))
+        return
+
+    es_archivo = isinstance(fuente, str)
+    if es_archivo:
+        fps_fuente = cap.get(cv2.CAP_PROP_FPS) or config['fps']
+    else:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, config['resolucion'][0])
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, config['resolucion'][1])
+        cap.set(cv2.CAP_PROP_FPS, config['fps'])
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        fps_fuente = config['fps']
+
+    pose = mp.solutions.pose.Pose(
+        static_image_mode=False,
+        model_complexity=config['model_complexity'],
+        enable_segmentation=False,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5
+    )
+
+    t_inicio = config['t_inicio']
+    frame_idx = 0
+    try:
+        while not evento_parada.is_set():
+            success, frame = cap.read()
+            if not success:
+                if es_archivo:
+                    break  # Fin del video
+                continue
+
+            if es_archivo:
+                # El video se reproduce en tiempo real como si fuera una cámara;
+                # el timestamp sale del propio archivo para que varias vistas
+                # grabadas a la vez queden alineadas con exactitud.
+                timestamp = t_inicio + frame_idx / fps_fuente
+                espera = timestamp - time.time()
+                if espera > 0:
+                    time.sleep(espera)
+            else:
+                timestamp = time.time()
+                if timestamp < t_inicio:
+                    # Las cámaras empiezan junto con los videos, cuando todas
+                    # las vistas ya cargaron el modelo
+                    continue
+
+            image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            image_rgb.flags.writeable = False
+            results = pose.process(image_rgb)
+
+            landmarks = np.full((NUM_LANDMARKS, len(CAMPOS_LANDMARK)), np.nan, dtype=np.float32)
+            if results.pose_landmarks:
+                landmarks[:] = [(lm.x, lm.y, lm.z, lm.visibility)
+                                for lm in results.pose_landmarks.landmark]
+
+            cola_salida.put(('muestra', id_vista, frame_idx, timestamp, landmarks))
+            frame_idx += 1
+    finally:
+        cap.release()
+        pose.close()
+        cola_salida.put(('fin', id_vista))
+
+
+class CoordinadorMulticamara:
+    def __init__(self, fuentes, nombres=None, fps=30, resolucion=(1280, 720),
+                 tolerancia=None, model_complexity=1):
+        """
+        Inicializa el coordinador de captura multicámara
+        Args:
+            fuentes: Lista de índices de cámara o rutas de video
+            nombres: Nombre de cada vista (p. ej. ['frontal', 'lateral'])
+            fps: Frecuencia de captura deseada
+            resolucion: Resolución de captura (ancho, alto)
+            tolerancia: Desfase máximo en segundos para emparejar muestras.
+                        Por defecto medio periodo de frame.
+            model_complexity: Complejidad del modelo MediaPipe en cada proceso
+        """
+        if len(fuentes) < 1:
+            raise ValueError("Se necesita al menos una fuente de video")
+
+        self.fuentes = [_parsear_fuente(f) for f in fuentes]
+        self.nombres = list(nombres) if nombres else [f"vista{i}" for i in range(len(fuentes))]
+        if len(self.nombres) != len(self.fuentes):
+            raise ValueError("Debe haber un nombre por cada fuente")
+
+        self.fps = fps
+        self.resolucion = resolucion
+        self.tolerancia = tolerancia if tolerancia is not None else 0.5 / fps
+        self.model_complexity = model_complexity
+
+        self.procesos = []
+        self.cola = None
+        self.evento_parada = None
+        self.start_time = None
+
+        # Muestras pendientes de alinear por vista: (frame_idx, timestamp, landmarks)
+        self.buffers = [deque() for _ in self.fuentes]
+        self.activas = [False] * len(self.fuentes)
+        self.frames_recibidos = [0] * len(self.fuentes)
+
+        # Datos de la sesión alineada
+        self.session_timestamps = []
+        self.session_frames = []
+        self.session_offsets = []
+        self.session_landmarks = []
+
+    def iniciar(self):
+        """Lanza un proceso de captura e inferencia por cada vista"""
+        ctx = multiprocessing.get_context('spawn')
+        self.cola = ctx.Queue()
+        self.evento_parada = ctx.Event()
+
+        # Margen para que todos los procesos carguen el modelo antes de
+        # empezar: los videos se reproducen y las cámaras registran desde este instante
+        self.start_time = time.time() + 2.0
+        config = {
+            'fps': self.fps,
+            'resolucion': self.resolucion,
+            'model_complexity': self.model_complexity,
+            't_inicio': self.start_time
+        }
+
+        for id_vista, fuente in enumerate(self.fuentes):
+            proceso = ctx.Process(
+                target=proceso_camara,
+                args=(id_vista, fuente, self.cola, self.evento_parada, config),
+                name=f"captura_{self.nombres[id_vista]}",
+                daemon=True
+            )
+            proceso.start()
+            self.procesos.append(proceso)
+            self.activas[id_vista] = True
+
+        print(f"Captura multicámara iniciada con {len(self.procesos)} procesos: "
+              f"{', '.join(self.nombres)}")
+
+    def _procesar_mensaje(self, mensaje):
+        """Incorpora un mensaje de un proceso de captura"""
+        tipo, id_vista = mensaje[0], mensaje[1]
+        if tipo == 'muestra':
+            _, _, frame_idx, timestamp, landmarks = mensaje
+            self.buffers[id_vista].append((frame_idx, timestamp, landmarks))
+            self.frames_recibidos[id_vista] += 1
+        elif tipo == 'error':
+            print(f"❌ Vista {self.nombres[id_vista]}: {mensaje[2]}")
+        elif tipo == 'fin':
+            self.activas[id_vista] = False
+            print(f"Vista {self.nombres[id_vista]} finalizada "
+                  f"({self.frames_recibidos[id_vista]} frames)")
+
+    def _alinear(self, forzar=False):
+        """
+        Empareja cada frame de la vista de referencia (la primera) con la
+        muestra más cercana en tiempo de cada una de las otras vistas.
+        Args:
+            forzar: Alinea con lo disponible sin esperar muestras posteriores
+        """
+        referencia = self.buffers[0]
+        num_vistas = len(self.fuentes)
+
+        while referencia:
+            frame_ref, t_ref, landmarks_ref = referencia[0]
+            frames = [frame_ref]
+            offsets = [0.0]
+            landmarks = [landmarks_ref]
+            listo = True
+
+            for id_vista in range(1, num_vistas):
+                buf = self.buffers[id_vista]
+
+                # Descartar muestras más antiguas que la mejor candidata
+                while len(buf) >= 2 and abs(buf[1][1] - t_ref) <= abs(buf[0][1] - t_ref):
+                    buf.popleft()
+
+                # Mientras la vista siga activa hace falta una muestra posterior
+                # a t_ref para garantizar que la candidata es la más cercana
+                if self.activas[id_vista] and not forzar and (not buf or buf[-1][1] < t_ref):
+                    listo = False
+                    break
+
+                if buf and abs(buf[0][1] - t_ref) <= self.tolerancia:
+                    frame_idx, timestamp, lm = buf[0]
+                    frames.append(frame_idx)
+                    offsets.append(timestamp - t_ref)
+                    landmarks.append(lm)
+                else:
+                    # Sin muestra dentro de la tolerancia: la vista queda vacía
+                    frames.append(-1)
+                    offsets.append(np.nan)
+                    landmarks.append(np.full((NUM_LANDMARKS, len(CAMPOS_LANDMARK)),
+                                             np.nan, dtype=np.float32))
+
+            if not listo:
+                break
+
+            referencia.popleft()
+            self.session_timestamps.append(t_ref)
+            self.session_frames.append(frames)
+            self.session_offsets.append(offsets)
+            self.session_landmarks.append(np.stack(landmarks))
+
+    def ejecutar(self, duracion=None):
+        """
+        Ejecuta la captura hasta que terminen las fuentes, se agote la
+        duración o se presione Ctrl+C
+        Args:
+            duracion: Duración máxima de la captura en segundos (None = sin límite)
+        """
+        self.iniciar()
+        ultimo_reporte = time.time()
+        try:
+            while self.activas[0]:
+                if duracion is not None and time.time() - self.start_time > duracion:
+                    break
+                try:
+                    mensaje = self.cola.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                self._procesar_mensaje(mensaje)
+                self._alinear()
+
+                if time.time() - ultimo_reporte > 2.0:
+                    ultimo_reporte = time.time()
+                    transcurrido = max(ultimo_reporte - self.start_time, 1e-6)
+                    estado = " | ".join(
+                        f"{nombre}: {n / transcurrido:.1f} FPS"
+                        for nombre, n in zip(self.nombres, self.frames_recibidos))
+                    print(f"{estado} | Frames alineados: {len(self.session_timestamps)}")
+        except KeyboardInterrupt:
+            print("\nCaptura interrumpida por el usuario")
+        finally:
+            self.detener()
+
+    def detener(self):
+        """Detiene los procesos y alinea las muestras pendientes"""
+        if self.evento_parada is None:
+            return
+        self.evento_parada.set()
+
+        # Vaciar la cola hasta recibir el fin de cada proceso; si no, los
+        # procesos pueden quedar bloqueados al terminar
+        limite = time.time() + 5.0
+        while any(self.activas) and time.time() < limite:
+            try:
+                self._procesar_mensaje(self.cola.get(timeout=0.1))
+            except queue.Empty:
+                continue
+
+        for proceso in self.procesos:
+            proceso.join(timeout=2)
+            if proceso.is_alive():
+                proceso.terminate()
+        self.procesos = []
+        self.activas = [False] * len(self.fuentes)
+
+        self._alinear(forzar=True)
+        print(f"Captura detenida. Frames alineados: {len(self.session_timestamps)}")
+
+    def obtener_sesion(self):
+        """Construye un DataFrame con todas las vistas alineadas"""
+        import pandas as pd
+
+        if not self.session_timestamps:
+            return pd.DataFrame()
+
+        timestamps = np.asarray(self.session_timestamps)
+        frames = np.asarray(self.session_frames)
+        offsets = np.asarray(self.session_offsets)
+        # (n_frames, n_vistas, 33, 4) -> (n_frames, n_vistas * 33 * 4)
+        landmarks = np.stack(self.session_landmarks)
+        landmarks = landmarks.reshape(len(timestamps), -1)
+
+        columnas = {
+            'timestamp': timestamps,
+            'elapsed_time': timestamps - self.start_time
+        }
+        for id_vista, nombre in enumerate(self.nombres):
+            columnas[f'{nombre}_frame'] = frames[:, id_vista]
+            columnas[f'{nombre}_desfase'] = offsets[:, id_vista]
+
+        columnas_landmarks = [
+            f'{nombre}_landmark_{idx}_{campo}'
+            for nombre in self.nombres
+            for idx in range(NUM_LANDMARKS)
+            for campo in CAMPOS_LANDMARK
+        ]
+
+        df = pd.DataFrame(columnas)
+        df_landmarks = pd.DataFrame(landmarks, columns=columnas_landmarks)
+        return pd.concat([df, df_landmarks], axis=1)
+
+    def save_data(self):
+        """Guarda la sesión alineada en un archivo CSV"""
+        df = self.obtener_sesion()
+        if df.empty:
+            print("No hay datos para guardar.")
+            return None
+        filename = f"multicam_analysis_{int(time.time())}.csv"
+        df.to_csv(filename, index=False)
+        print(f"Datos guardados en: {filename}")
+        return filename
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Captura multicámara con un proceso de inferencia por vista")
+    parser.add_argument('fuentes', nargs='+',
+                        help="Índices de cámara (0, 1, ...) o rutas a archivos de video")
+    parser.add_argument('--nombres', nargs='+', default=None,
+                        help="Nombre de cada vista, p. ej. frontal lateral")
+    parser.add_argument('--fps', type=int, default=30)
+    parser.add_argument('--duracion', type=float, default=None,
+                        help="Duración máxima en segundos")
+    parser.add_argument('--tolerancia', type=float, default=None,
+                        help="Desfase máximo en segundos para emparejar vistas")
+    parser.add_argument('--complejidad', type=int, default=1, choices=[0, 1, 2],
+                        help="Complejidad del modelo MediaPipe")
+    args = parser.parse_args()
+
+    coordinador = CoordinadorMulticamara(
+        args.fuentes,
+        nombres=args.nombres,
+        fps=args.fps,
+        tolerancia=args.tolerancia,
+        model_complexity=args.complejidad
+    )
+    coordinador.ejecutar(duracion=args.duracion)
+    coordinador.save_data()
+
+
+if __name__ == "__main__":
+    main()
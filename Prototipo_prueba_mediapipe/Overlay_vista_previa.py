@@ -0,0 +1,62 @@
+"""
+Vista previa en vivo a resolución y frecuencia reducidas
+
+Dibujar y mostrar el frame completo de 1280x720 en cada iteración cuesta
+una parte apreciable del presupuesto por frame. Este renderizador:
+- dibuja sobre un frame de visualización reducido (escala_display)
+- escala las posiciones y el tamaño de los textos, que se indican en
+  coordenadas del frame de la cámara, para que el overlay ocupe la misma
+  proporción de la ventana a cualquier escala
+- limita el refresco de la ventana a la frecuencia de visualización,
+  independiente de la frecuencia de inferencia
+
+El texto se dibuja directamente con cv2.putText, que solo modifica los
+píxeles de los glifos; componer parches de texto en caché resulta más lento.
+
+Solo afecta a lo que se muestra; los datos analizados y guardados no cambian.
+"""
+import time
+
+import cv2
+
+FUENTE = cv2.FONT_HERSHEY_SIMPLEX
+
+
+class RenderizadorOverlay:
+    """Dibuja el overlay sobre un frame de visualización reducido"""
+
+    def __init__(self, escala_display=0.5, fps_display=30):
+        """
+        Args:
+            escala_display: Factor de tamaño de la ventana respecto al frame de la cámara
+            fps_display: Frecuencia máxima de refresco de la ventana
+        """
+        self.escala_display = escala_display
+        self.periodo_display = 1.0 / fps_display if fps_display else 0.0
+        self.ultimo_refresco = 0.0
+
+    def debe_refrescar(self):
+        """True si ya pasó un periodo de visualización desde el último refresco"""
+        ahora = time.perf_counter()
+        if ahora - self.ultimo_refresco < self.periodo_display:
+            return False
+        self.ultimo_refresco = ahora
+        return True
+
+    def preparar_frame(self, frame):
+        """Devuelve el frame de visualización (reducido o una copia del original)"""
+        if self.escala_display == 1:
+            return frame.copy()
+        return cv2.resize(frame, None, fx=self.escala_display, fy=self.escala_display,
+                          interpolation=cv2.INTER_LINEAR)
+
+    def texto(self, imagen, texto, posicion, escala, color, grosor):
+        """
+        Dibuja un texto sobre el frame de visualización
+        Args:
+            posicion: (x, y) de la línea base en coordenadas del frame de la cámara
+            escala, grosor: Tamaño de fuente y grosor para el frame de la cámara
+        """
+        e = self.escala_display
+        cv2.putText(imagen, texto, (int(posicion[0] * e), int(posicion[1] * e)), FUENTE,
+                    escala * e, color, max(1, round(grosor * e)))
@@ -1,25 +1,38 @@
+import argparse
 import cv2
 import mediapipe as mp
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-from collections import deque
 import time
 import math
 
+from Suavizado_landmarks import crear_filtro_pose
+from Overlay_vista_previa import RenderizadorOverlay
+from Backend_pose import BACKEND_SOLUCIONES, BACKENDS, crear_backend, CapturaEnHilo
+
 class JumpAnalyzer:
-    def __init__(self):
+    def __init__(self, display_scale=0.5, display_fps=30, backend=BACKEND_SOLUCIONES, model_path=None):
+        """
+        Args:
+            display_scale: Tamaño de la ventana de vista previa respecto a la cámara
+            display_fps: Frecuencia máxima de refresco de la vista previa
+            backend: 'soluciones' (mp.solutions.pose, síncrono) o
+                     'tareas' (PoseLandmarker LIVE_STREAM, asíncrono)
+            model_path: Archivo .task de PoseLandmarker (solo backend 'tareas')
+        """
         # Configuración de MediaPipe
         self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose(
-            static_image_mode=False,
+        self.backend = crear_backend(
+            backend,
+            ruta_modelo=model_path,
             model_complexity=1,
-            enable_segmentation=False,
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5
         )
         self.mp_drawing = mp.solutions.drawing_utils
         
+        # Vista previa: overlay sobre un frame reducido, refrescada a display_fps
+        self.overlay = RenderizadorOverlay(display_scale, display_fps)
+        
         # Variables para análisis
         self.pose_data = []
         self.timestamps = []
@@ -27,9 +40,10 @@ class JumpAnalyzer:
         self.recording = False
         self.start_time = None
         
-        # Buffer para suavizado de datos
-        self.position_buffer = deque(maxlen=10)
-        self.velocity_buffer = deque(maxlen=5)
+        # Suavizado One-Euro de los 33 landmarks (parámetros ajustables por articulación
+        # con self.smoother.configurar_articulacion). Alimenta el overlay y los datos grabados.
+        self.smoother = crear_filtro_pose()
+        self.smoothing_enabled = True
         
         # Variables para detección de salto
         self.baseline_hip_y = None
@@ -69,6 +83,20 @@ class JumpAnalyzer:
         """Calcula la distancia euclidiana entre dos puntos"""
         return np.sqrt((point1[0] - point2[0])**2 + (point1[1] - point2[1])**2)
     
+    def smooth_landmarks(self, landmarks, frame_time):
+        """
+        Suaviza en el lugar las coordenadas x, y, z de los landmarks
+        Args:
+            landmarks: Lista de landmarks de MediaPipe (se modifican sus valores)
+            frame_time: Tiempo de captura del frame en segundos (reloj monótono)
+        """
+        raw = np.array([[lm.x, lm.y, lm.z] for lm in landmarks])
+        smoothed = self.smoother.filtrar(raw, frame_time)
+        
+        # Escribir de vuelta para que dibujo y análisis usen los valores suavizados
+        for lm, (x, y, z) in zip(landmarks, smoothed.tolist()):
+            lm.x, lm.y, lm.z = x, y, z
+    
     def get_center_of_mass(self, landmarks):
         """Estima el centro de masa usando puntos clave de MediaPipe"""
         # Puntos principales para estimar COM
@@ -185,32 +213,40 @@ class JumpAnalyzer:
         return pose_data_point
     
     def draw_metrics_overlay(self, image, pose_data_point):
-        """Dibuja las métricas en tiempo real sobre la imagen"""
-        h, w, _ = image.shape
+        """
+        Dibuja las métricas en tiempo real sobre la imagen de visualización
+        Las posiciones y tamaños están en coordenadas del frame de la cámara;
+        el renderizador los escala a la ventana.
+        """
+        # Alto del frame de la cámara correspondiente a la imagen reducida
+        h = int(image.shape[0] / self.overlay.escala_display)
+        text = self.overlay.texto
         
         # Información del estado
-        cv2.putText(image, f"Recording: {'ON' if self.recording else 'OFF'}", 
-                   (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0) if self.recording else (0, 0, 255), 2)
+        text(image, f"Recording: {'ON' if self.recording else 'OFF'}", 
+             (10, 30), 0.7, (0, 255, 0) if self.recording else (0, 0, 255), 2)
         
         # Métricas en tiempo real
-        cv2.putText(image, f"Jump Height: {self.metrics['jump_height']:.1f} cm", 
-                   (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-        cv2.putText(image, f"Flight Time: {self.metrics['flight_time']:.2f} s", 
-                   (10, 85), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-        cv2.putText(image, f"Knee Angle: {pose_data_point['left_knee_angle']:.1f}° / {pose_data_point['right_knee_angle']:.1f}°", 
-                   (10, 110), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-        cv2.putText(image, f"Symmetry: {pose_data_point['knee_symmetry']:.1f}%", 
-                   (10, 135), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-        cv2.putText(image, f"Status: {'IN AIR' if self.in_air else 'ON GROUND'}", 
-                   (10, 160), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255) if self.in_air else (255, 0, 0), 2)
+        text(image, f"Jump Height: {self.metrics['jump_height']:.1f} cm", 
+             (10, 60), 0.6, (255, 255, 255), 2)
+        text(image, f"Flight Time: {self.metrics['flight_time']:.2f} s", 
+             (10, 85), 0.6, (255, 255, 255), 2)
+        text(image, f"Knee Angle: {pose_data_point['left_knee_angle']:.1f}° / {pose_data_point['right_knee_angle']:.1f}°", 
+             (10, 110), 0.6, (255, 255, 255), 2)
+        text(image, f"Symmetry: {pose_data_point['knee_symmetry']:.1f}%", 
+             (10, 135), 0.6, (255, 255, 255), 2)
+        text(image, f"Status: {'IN AIR' if self.in_air else 'ON GROUND'}", 
+             (10, 160), 0.6, (0, 255, 255) if self.in_air else (255, 0, 0), 2)
         
         # Instrucciones
-        cv2.putText(image, "Press 'r' to start/stop recording, 'q' to quit, 's' to save data", 
-                   (10, h-20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
+        text(image, "Press 'r' to start/stop recording, 'q' to quit, 's' to save data", 
+             (10, h-20), 0.5, (200, 200, 200), 1)
     
     def save_data(self):
         """Guarda los datos recolectados en un archivo CSV"""
         if len(self.pose_data) > 0:
+            # pandas solo se necesita al guardar, no en el bucle en vivo
+            import pandas as pd
             df = pd.DataFrame(self.pose_data)
             filename = f"jump_analysis_{int(time.time())}.csv"
             df.to_csv(filename, index=False)
@@ -232,6 +268,41 @@ class JumpAnalyzer:
         print(f"Total de frames analizados: {len(self.pose_data)}")
         print("="*50)
     
+    def process_result(self, image, frame_time, results):
+        """
+        Analiza el resultado de un frame y actualiza la vista previa
+        Args:
+            image: Frame BGR original
+            frame_time: Tiempo de captura del frame (reloj monótono)
+            results: Resultado del backend de pose para ese frame
+        """
+        pose_data_point = None
+        if results.pose_landmarks:
+            if self.smoothing_enabled:
+                self.smooth_landmarks(results.pose_landmarks.landmark, frame_time)
+            
+            # Analizar pose si estamos grabando (en cada frame, aunque no se muestre)
+            if self.recording and frame_time >= self.start_time:
+                current_time = frame_time - self.start_time
+                pose_data_point = self.analyze_pose(results.pose_landmarks.landmark, current_time)
+        
+        # Mostrar imagen a la frecuencia de visualización, sobre un frame reducido
+        if self.overlay.debe_refrescar():
+            display = self.overlay.preparar_frame(image)
+            
+            # Dibujar landmarks
+            if results.pose_landmarks:
+                self.mp_drawing.draw_landmarks(
+                    display, results.pose_landmarks, self.mp_pose.POSE_CONNECTIONS)
+                
+                if pose_data_point is not None:
+                    self.draw_metrics_overlay(display, pose_data_point)
+                else:
+                    # Solo mostrar overlay básico
+                    self.overlay.texto(display, "Recording: OFF", (10, 30), 0.7, (0, 0, 255), 2)
+            
+            cv2.imshow('Análisis Biomecánico - MediaPipe', display)
+    
     def run(self):
         """Función principal para ejecutar el análisis"""
         cap = cv2.VideoCapture(0)
@@ -245,43 +316,24 @@ class JumpAnalyzer:
         print("Instrucciones:")
         print("- Presiona 'r' para iniciar/detener grabación")
         print("- Presiona 's' para guardar datos")
+        print("- Presiona 'f' para activar/desactivar el suavizado de landmarks")
         print("- Presiona 'q' para salir")
         print("- Colócate de perfil a la cámara para mejor análisis")
         
-        while cap.isOpened():
-            success, image = cap.read()
-            if not success:
-                print("Ignorando frame vacío de la cámara.")
-                continue
-            
-            # Convertir de BGR a RGB
-            image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            image_rgb.flags.writeable = False
-            
-            # Procesar con MediaPipe
-            results = self.pose.process(image_rgb)
-            
-            # Convertir de vuelta a BGR para OpenCV
-            image_rgb.flags.writeable = True
-            image = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR)
-            
-            # Dibujar landmarks
-            if results.pose_landmarks:
-                self.mp_drawing.draw_landmarks(
-                    image, results.pose_landmarks, self.mp_pose.POSE_CONNECTIONS)
-                
-                # Analizar pose si estamos grabando
-                if self.recording:
-                    current_time = time.time() - self.start_time
-                    pose_data_point = self.analyze_pose(results.pose_landmarks.landmark, current_time)
-                    self.draw_metrics_overlay(image, pose_data_point)
-                else:
-                    # Solo mostrar overlay básico
-                    cv2.putText(image, "Recording: OFF", (10, 30), 
-                              cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+        # Etapas en paralelo: la captura corre en su hilo, la inferencia en el
+        # backend (asíncrona con 'tareas') y el análisis en este bucle
+        capture = CapturaEnHilo(cap)
+        
+        while capture.activa:
+            success, image, frame_time = capture.leer()
+            if success and not self.backend.ocupado():
+                # Con el backend 'tareas' no bloquea: el frame se infiere mientras
+                # se analizan los resultados de los frames anteriores
+                self.backend.enviar(image, frame_time)
             
-            # Mostrar imagen
-            cv2.imshow('Análisis Biomecánico - MediaPipe', image)
+            # Resultados en el mismo orden en que se enviaron los frames
+            for frame, result_time, results in self.backend.obtener_resultados():
+                self.process_result(frame, result_time, results)
             
             # Manejo de teclas
             key = cv2.waitKey(5) & 0xFF
@@ -290,7 +342,7 @@ class JumpAnalyzer:
             elif key == ord('r'):
                 if not self.recording:
                     self.recording = True
-                    self.start_time = time.time()
+                    self.start_time = time.perf_counter()
                     self.pose_data = []
                     self.baseline_hip_y = None
                     self.max_height = 0
@@ -298,6 +350,7 @@ class JumpAnalyzer:
                     self.takeoff_time = None
                     self.landing_time = None
                     self.in_air = False
+                    self.smoother.reiniciar()
                     print("¡Grabación iniciada!")
                 else:
                     self.recording = False
@@ -307,10 +360,23 @@ class JumpAnalyzer:
                     self.save_data()
                 else:
                     print("No hay datos para guardar. Inicia una grabación primero.")
+            elif key == ord('f'):
+                self.smoothing_enabled = not self.smoothing_enabled
+                self.smoother.reiniciar()
+                print(f"Suavizado de landmarks: {'ON' if self.smoothing_enabled else 'OFF'}")
         
+        capture.detener()
         cap.release()
+        self.backend.cerrar()
         cv2.destroyAllWindows()
 
 if __name__ == "__main__":
-    analyzer = JumpAnalyzer()
+    parser = argparse.ArgumentParser(description="Análisis biomecánico de saltos en tiempo real")
+    parser.add_argument('--backend', choices=BACKENDS, default=BACKEND_SOLUCIONES,
+                        help="Backend de pose: 'soluciones' (síncrono) o 'tareas' (PoseLandmarker asíncrono)")
+    parser.add_argument('--modelo', default=None,
+                        help="Archivo .task de PoseLandmarker para el backend 'tareas'")
+    args = parser.parse_args()
+    
+    analyzer = JumpAnalyzer(backend=args.backend, model_path=args.modelo)
     analyzer.run()
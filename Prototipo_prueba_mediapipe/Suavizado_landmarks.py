@@ -0,0 +1,125 @@
+"""
+Suavizado en línea de landmarks (filtro One-Euro vectorizado)
+
+Filtra las 33x3 coordenadas de MediaPipe Pose con una sola operación de
+NumPy por frame. El One-Euro es un pasa-bajas de primer orden cuya
+frecuencia de corte sube con la velocidad del punto, así:
+- en reposo se elimina el temblor de la detección (corte bajo)
+- en movimientos rápidos (despegue, aterrizaje) el retardo es mínimo (corte alto)
+
+A diferencia del filtrado filtfilt del post-procesamiento, solo usa
+muestras pasadas y se puede aplicar en el bucle en vivo.
+
+Referencia: Casiez, G., Roussel, N. & Vogel, D. (2012). 1€ Filter: A Simple
+Speed-based Low-pass Filter for Noisy Input in Interactive Systems.
+"""
+import numpy as np
+
+NUM_LANDMARKS = 33
+
+# Parámetros iniciales por grupo de articulaciones (coordenadas normalizadas 0-1).
+# min_cutoff (Hz): suavizado en reposo, menor = más suave.
+# beta: cuánto sube el corte con la velocidad, mayor = menos retardo en movimientos rápidos.
+PARAMETROS_POR_GRUPO = {
+    # Cara (0-10): poco relevante para el salto y con mucho temblor
+    'cara': (range(0, 11), 0.5, 2.0),
+    # Hombros, codos y caderas: referencia del tronco y del centro de masa
+    'tronco': ((11, 12, 13, 14, 23, 24), 1.0, 5.0),
+    # Muñecas y manos: movimientos rápidos de brazos
+    'manos': (range(15, 23), 1.5, 10.0),
+    # Rodillas, tobillos y pies: ángulos articulares y fases del salto
+    'piernas': (range(25, 33), 1.2, 8.0),
+}
+
+
+def _alpha(corte, dt):
+    """Factor de suavizado de un pasa-bajas de primer orden"""
+    tau = 1.0 / (2 * np.pi * corte)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class FiltroOneEuro:
+    """
+    Banco de filtros One-Euro sobre un arreglo (num_puntos, num_ejes)
+    Cada punto tiene su propio min_cutoff y beta (ver configurar_articulacion).
+    """
+
+    def __init__(self, num_puntos=NUM_LANDMARKS, num_ejes=3, min_cutoff=1.0, beta=0.0,
+                 d_cutoff=1.0, max_hueco=0.5):
+        """
+        Args:
+            num_puntos: Número de landmarks filtrados
+            num_ejes: Coordenadas por landmark (x, y, z)
+            min_cutoff: Frecuencia de corte mínima (Hz) inicial de todos los puntos
+            beta: Coeficiente de velocidad inicial de todos los puntos
+            d_cutoff: Frecuencia de corte (Hz) para suavizar la velocidad
+            max_hueco: Si pasan más de estos segundos sin muestras se reinicia el filtro
+        """
+        self.forma = (num_puntos, num_ejes)
+        # Columnas (num_puntos, 1) para que se apliquen a todos los ejes por broadcasting
+        self.min_cutoff = np.full((num_puntos, 1), float(min_cutoff))
+        self.beta = np.full((num_puntos, 1), float(beta))
+        self.d_cutoff = d_cutoff
+        self.max_hueco = max_hueco
+        self.reiniciar()
+
+    def configurar_articulacion(self, indices, min_cutoff=None, beta=None):
+        """
+        Ajusta los parámetros de uno o varios landmarks
+        Args:
+            indices: Índice o lista de índices de landmarks (p. ej. PoseLandmark.LEFT_KNEE.value)
+            min_cutoff: Nueva frecuencia de corte mínima (Hz); None la deja igual
+            beta: Nuevo coeficiente de velocidad; None lo deja igual
+        """
+        indices = np.atleast_1d(indices)
+        if min_cutoff is not None:
+            self.min_cutoff[indices] = min_cutoff
+        if beta is not None:
+            self.beta[indices] = beta
+
+    def reiniciar(self):
+        """Olvida el estado; la siguiente muestra se toma tal cual"""
+        self.x_previo = None
+        self.dx_previo = np.zeros(self.forma)
+        self.t_previo = None
+
+    def filtrar(self, puntos, t):
+        """
+        Filtra una muestra
+        Args:
+            puntos: Arreglo (num_puntos, num_ejes) con las coordenadas crudas
+            t: Tiempo de la muestra en segundos (reloj monótono)
+        Returns:
+            Arreglo (num_puntos, num_ejes) suavizado
+        """
+        x = np.asarray(puntos, dtype=float)
+        if self.x_previo is None:
+            self.x_previo, self.t_previo = x.copy(), t
+            return x.copy()
+
+        dt = t - self.t_previo
+        if dt <= 0:
+            return self.x_previo.copy()
+        if dt > self.max_hueco:
+            # Tras perder la detección no se interpola desde una pose antigua
+            self.reiniciar()
+            return self.filtrar(x, t)
+
+        # Velocidad suavizada y corte adaptativo por punto
+        dx = (x - self.x_previo) / dt
+        a_d = _alpha(self.d_cutoff, dt)
+        dx_suave = a_d * dx + (1 - a_d) * self.dx_previo
+        corte = self.min_cutoff + self.beta * np.abs(dx_suave)
+        a = _alpha(corte, dt)
+        x_suave = a * x + (1 - a) * self.x_previo
+
+        self.x_previo, self.dx_previo, self.t_previo = x_suave, dx_suave, t
+        return x_suave
+
+
+def crear_filtro_pose(**kwargs):
+    """Crea un FiltroOneEuro para los 33 landmarks de Pose con los parámetros por grupo"""
+    filtro = FiltroOneEuro(NUM_LANDMARKS, 3, **kwargs)
+    for indices, min_cutoff, beta in PARAMETROS_POR_GRUPO.values():
+        filtro.configurar_articulacion(indices, min_cutoff=min_cutoff, beta=beta)
+    return filtro
@@ -0,0 +1,503 @@
+"""
+MOTOR DE CAPTURA EN PROCESO SEPARADO CON MEMORIA COMPARTIDA
+================================================================
+
+La captura de video, la inferencia de MediaPipe y la simulación IMU se
+ejecutan en un proceso independiente de la interfaz gráfica, de modo que
+Tk, matplotlib y los diálogos no compiten por el GIL con el hilo de captura.
+
+El motor publica en multiprocessing.shared_memory:
+- El último frame procesado (varias ranuras rotativas)
+- Un buffer circular con las muestras visuales (landmarks + métricas)
+- Un buffer circular con las muestras IMU simuladas
+
+Cada bloque tiene un único escritor y contadores de secuencia; los lectores
+no usan locks: copian los datos y comprueban después con el contador si el
+escritor alcanzó las filas leídas (esquema tipo seqlock).
+
+El proceso de la GUI usa ClienteMotorCompartido, que ofrece la misma
+interfaz que AdquisicionDataCamara y Simulador_IMU. El motor se lanza al
+abrir la interfaz: carga y precalienta el modelo de pose mientras el usuario
+configura la sesión, y abre la cámara cuando se inicializa el sistema.
+
+Autor: Daniel Andres Ramirez Segura
+"""
+
+import logging
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from Nucleo_adquisicion import (AdquisicionDataCamara, Simulador_IMU, TIEMPOS_ARRANQUE,
+                                crear_modelo_pose, calentar_modelo_pose, BACKEND_SOLUCIONES)
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# DISPOSICIÓN DE LOS DATOS EN MEMORIA COMPARTIDA
+# =============================================================================
+
+# Campos de cada muestra visual, en el mismo orden que el CSV exportado.
+CAMPOS_VISUALES = (
+    ['timestamp', 'frame_number', 'elapsed_time'] +
+    [f'landmark_{idx}_{campo}' for idx in range(33) for campo in ('x', 'y', 'z', 'visibility')] +
+    ['center_of_mass_x', 'center_of_mass_y', 'knee_angle_right', 'knee_angle_left',
+     'trunk_angle', 'hip_height', 'symmetry_index', 'velocity_x_estimated',
+     'detection_confidence', 'detection_completeness', 'valid_landmarks']
+)
+# Campos numéricos de cada muestra IMU (la ubicación se deduce de sensor_id).
+CAMPOS_IMU = ['timestamp', 'sensor_id', 'accel_x', 'accel_y', 'accel_z',
+              'gyro_x', 'gyro_y', 'gyro_z', 'mag_x', 'mag_y', 'mag_z']
+# Campos que se guardan como float pero son enteros en la muestra original.
+CAMPOS_ENTEROS = ('frame_number', 'valid_landmarks', 'sensor_id')
+
+# Capacidades iguales a las de los deques de AdquisicionDataCamara y Simulador_IMU.
+CAPACIDAD_VISUAL = 5000
+CAPACIDAD_IMU = 50000
+# Ranuras rotativas para el frame; el lector puede usar una ranura sin copiarla
+# mientras el escritor no avance más de NUM_RANURAS_FRAME - 2 frames.
+NUM_RANURAS_FRAME = 3
+
+# Bytes reservados al inicio de cada bloque para los contadores (int64).
+_TAM_CABECERA = 64
+
+
+class AnilloCompartido:
+    """
+    BUFFER CIRCULAR DE FILAS float64 EN MEMORIA COMPARTIDA
+
+    Un solo escritor y cualquier número de lectores. La cabecera tiene dos
+    contadores: 'reservado' (filas que el escritor está escribiendo) y
+    'publicado' (filas completas). Una fila i es válida para el lector si
+    después de copiarla se cumple i >= reservado - capacidad.
+    """
+
+    def __init__(self, capacidad, num_campos, nombre=None, crear=False):
+        self.capacidad = capacidad
+        self.num_campos = num_campos
+        tamano = _TAM_CABECERA + capacidad * num_campos * 8
+        self.shm = shared_memory.SharedMemory(name=nombre, create=crear, size=tamano if crear else 0)
+        self.nombre = self.shm.name
+        # Contadores: [0] = publicado, [1] = reservado.
+        self.contadores = np.ndarray((2,), dtype=np.int64, buffer=self.shm.buf, offset=0)
+        self.datos = np.ndarray((capacidad, num_campos), dtype=np.float64,
+                                buffer=self.shm.buf, offset=_TAM_CABECERA)
+        if crear:
+            self.contadores[:] = 0
+
+    def escribir(self, filas):
+        """Agrega filas (n, num_campos) al buffer. Solo lo llama el escritor."""
+        filas = np.asarray(filas, dtype=np.float64).reshape(-1, self.num_campos)
+        n = len(filas)
+        if n == 0:
+            return
+        total = int(self.contadores[0])
+        # Si llegan más filas que la capacidad solo se conservan las últimas.
+        if n > self.capacidad:
+            total += n - self.capacidad
+            filas = filas[-self.capacidad:]
+            n = self.capacidad
+        self.contadores[1] = total + n
+        self.datos[(total + np.arange(n)) % self.capacidad] = filas
+        self.contadores[0] = total + n
+
+    def total(self):
+        """Número de filas publicadas desde el inicio."""
+        return int(self.contadores[0])
+
+    def leer(self, ultimas=None):
+        """
+        Copia las filas más recientes sin bloquear al escritor
+        Args:
+            ultimas: Número máximo de filas a leer (None = todo el buffer)
+        Returns:
+            Array (n, num_campos) con las filas válidas, de la más antigua a la más reciente
+        """
+        publicado = int(self.contadores[0])
+        n = min(publicado, self.capacidad)
+        if ultimas is not None:
+            n = min(n, ultimas)
+        inicio = publicado - n
+        copia = self.datos[np.arange(inicio, publicado) % self.capacidad]
+        # Descartar las filas que el escritor pudo sobrescribir durante la copia.
+        reservado = int(self.contadores[1])
+        descartar = max(0, reservado - self.capacidad - inicio)
+        return copia[descartar:]
+
+    def cerrar(self, eliminar=False):
+        """Libera la vista local; el propietario además elimina el bloque."""
+        del self.contadores, self.datos
+        self.shm.close()
+        if eliminar:
+            self.shm.unlink()
+
+
+class FrameCompartido:
+    """
+    ÚLTIMO FRAME PROCESADO EN MEMORIA COMPARTIDA
+
+    El escritor rota entre NUM_RANURAS_FRAME ranuras y luego incrementa el
+    contador de secuencia. El lector obtiene una vista sin copia de la ranura
+    más reciente y, al terminar de usarla, verifica con el contador que el
+    escritor no haya empezado a reutilizarla.
+    """
+
+    def __init__(self, forma, nombre=None, crear=False, num_ranuras=NUM_RANURAS_FRAME):
+        self.forma = tuple(forma)
+        self.num_ranuras = num_ranuras
+        tamano_ranura = int(np.prod(self.forma))
+        tamano = _TAM_CABECERA + num_ranuras * tamano_ranura
+        self.shm = shared_memory.SharedMemory(name=nombre, create=crear, size=tamano if crear else 0)
+        self.nombre = self.shm.name
+        self.secuencia = np.ndarray((1,), dtype=np.int64, buffer=self.shm.buf, offset=0)
+        self.ranuras = np.ndarray((num_ranuras,) + self.forma, dtype=np.uint8,
+                                  buffer=self.shm.buf, offset=_TAM_CABECERA)
+        if crear:
+            self.secuencia[0] = 0
+
+    def escribir(self, frame):
+        """Publica un frame BGR. Solo lo llama el escritor."""
+        if frame.shape != self.forma:
+            frame = cv2.resize(frame, (self.forma[1], self.forma[0]))
+        siguiente = int(self.secuencia[0]) + 1
+        self.ranuras[siguiente % self.num_ranuras][...] = frame
+        self.secuencia[0] = siguiente
+
+    def leer(self):
+        """
+        Returns:
+            (vista, secuencia) del último frame publicado, o (None, 0) si aún no hay frames.
+            La vista apunta directamente a la memoria compartida (sin copia).
+        """
+        secuencia = int(self.secuencia[0])
+        if secuencia == 0:
+            return None, 0
+        return self.ranuras[secuencia % self.num_ranuras], secuencia
+
+    def sigue_valido(self, secuencia):
+        """Indica si la ranura de 'secuencia' no ha empezado a sobrescribirse."""
+        return int(self.secuencia[0]) - secuencia <= self.num_ranuras - 2
+
+    def cerrar(self, eliminar=False):
+        """Libera la vista local; el propietario además elimina el bloque."""
+        del self.secuencia, self.ranuras
+        self.shm.close()
+        if eliminar:
+            self.shm.unlink()
+
+
+# =============================================================================
+# PROCESO DEL MOTOR (CAPTURA + INFERENCIA + SIMULACIÓN IMU)
+# =============================================================================
+
+def _muestra_visual_a_fila(muestra):
+    """Convierte un diccionario de muestra visual en una fila de CAMPOS_VISUALES."""
+    return [muestra.get(campo, np.nan) for campo in CAMPOS_VISUALES]
+
+
+def proceso_motor(imu_sample_rate, conexion):
+    """
+    Punto de entrada del proceso del motor
+    Args:
+        imu_sample_rate: Frecuencia de muestreo del simulador IMU
+        conexion: Extremo del Pipe para recibir comandos de la GUI
+    """
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    # Fase 1: cargar y precalentar el modelo antes de que se elija la cámara.
+    try:
+        inicio = time.perf_counter()
+        pose = crear_modelo_pose()
+        TIEMPOS_ARRANQUE['crear modelo pose'] = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        calentar_modelo_pose(pose)
+        TIEMPOS_ARRANQUE['calentamiento modelo pose'] = time.perf_counter() - inicio
+    except Exception as e:
+        conexion.send(('error', f"Error cargando modelo de pose: {e}"))
+        return
+    conexion.send(('modelo_listo', dict(TIEMPOS_ARRANQUE)))
+
+    # Fase 2: esperar la configuración de la cámara.
+    try:
+        comando, config = conexion.recv()
+    except (EOFError, KeyboardInterrupt):
+        return
+    if comando != 'abrir_camara':
+        return
+    try:
+        camara = AdquisicionDataCamara(camera_id=config['camera_id'], fps=config['fps'],
+                                       resolution=config['resolution'], pose=pose,
+                                       backend=config['backend'], ruta_modelo=config['ruta_modelo'])
+        simulador = Simulador_IMU(num_sensors=11, sample_rate=imu_sample_rate)
+    except Exception as e:
+        conexion.send(('error', str(e)))
+        return
+
+    # Tamaño real entregado por la cámara (puede diferir del solicitado).
+    alto = int(camara.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or config['resolution'][1]
+    ancho = int(camara.cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or config['resolution'][0]
+
+    frames = FrameCompartido((alto, ancho, 3), crear=True)
+    anillo_visual = AnilloCompartido(CAPACIDAD_VISUAL, len(CAMPOS_VISUALES), crear=True)
+    anillo_imu = AnilloCompartido(CAPACIDAD_IMU, len(CAMPOS_IMU), crear=True)
+
+    def publicar_visual(muestra, frame):
+        anillo_visual.escribir(_muestra_visual_a_fila(muestra))
+        if frame is not None:
+            frames.escribir(frame)
+
+    def publicar_imu(lote):
+        anillo_imu.escribir([[muestra[campo] for campo in CAMPOS_IMU] for muestra in lote])
+
+    camara.publicador = publicar_visual
+    simulador.publicador = publicar_imu
+
+    conexion.send(('listo', {
+        'frame': frames.nombre,
+        'forma_frame': (alto, ancho, 3),
+        'visual': anillo_visual.nombre,
+        'imu': anillo_imu.nombre
+    }))
+    logger.info("Motor de captura listo en proceso separado")
+
+    try:
+        while True:
+            comando, argumento = conexion.recv()
+            if comando == 'iniciar_video':
+                # La GUI espera el resultado para informar si no se pudo crear el archivo.
+                conexion.send(('video', camara.iniciar_grabacion_video(argumento)))
+            elif comando == 'iniciar':
+                camara.comenzar_grabacion()
+            elif comando == 'iniciar_imu':
+                simulador.comenzar_grabacion(camara)
+            elif comando == 'detener':
+                camara.detener_grabacion()
+            elif comando == 'detener_imu':
+                simulador.detener_grabacion()
+            elif comando == 'salir':
+                break
+    except (EOFError, KeyboardInterrupt):
+        # La GUI se cerró sin enviar 'salir'.
+        pass
+    finally:
+        simulador.detener_grabacion()
+        camara.detener_grabacion()
+        camara.cap.release()
+        frames.cerrar(eliminar=True)
+        anillo_visual.cerrar(eliminar=True)
+        anillo_imu.cerrar(eliminar=True)
+        logger.info("Motor de captura finalizado")
+
+
+# =============================================================================
+# CLIENTE PARA EL PROCESO DE LA GUI
+# =============================================================================
+
+class ClienteMotorCompartido:
+    """
+    CONTROL DEL MOTOR DE CAPTURA DESDE LA INTERFAZ
+
+    Lanza el proceso del motor, le envía comandos por un Pipe y lee los
+    datos directamente de la memoria compartida. Expone los mismos métodos
+    que usa Interfaz_Biomecanica de AdquisicionDataCamara; el simulador IMU
+    remoto está disponible en el atributo simulador_imu.
+    """
+
+    def __init__(self, imu_sample_rate=1000):
+        """Lanza el proceso del motor; retorna de inmediato mientras el modelo se carga."""
+        self.camera_id = None
+        self.fps = None
+        self.resolution = None
+        self.is_recording = False
+        self.imu_sample_rate = imu_sample_rate
+        self.tiempos_modelo = None
+        self.error = None
+        self.frames = None
+        self.anillo_visual = None
+        self.anillo_imu = None
+        self.simulador_imu = None
+
+        contexto = multiprocessing.get_context('spawn')
+        self.conexion, conexion_motor = contexto.Pipe()
+        self.proceso = contexto.Process(target=proceso_motor, args=(imu_sample_rate, conexion_motor),
+                                        name="motor_captura", daemon=True)
+        self.proceso.start()
+        # El extremo del motor se cierra aquí: si el motor termina, recv() da EOFError.
+        conexion_motor.close()
+
+    def _recibir(self, timeout):
+        """Procesa un mensaje del motor si llega antes de 'timeout' segundos."""
+        try:
+            if self.conexion.poll(timeout):
+                estado, info = self.conexion.recv()
+            # Sin mensajes pendientes y con el proceso terminado, el motor ya no responderá.
+            elif self.proceso is None or not self.proceso.is_alive():
+                estado, info = 'error', "El motor de captura terminó inesperadamente"
+            else:
+                return None
+        except (EOFError, OSError):
+            estado, info = 'error', "El motor de captura terminó inesperadamente"
+        if estado == 'modelo_listo':
+            self.tiempos_modelo = info
+        elif estado == 'error':
+            self.error = info
+        return estado, info
+
+    def modelo_listo(self):
+        """Indica sin bloquear si el motor terminó de cargar el modelo (o falló)."""
+        if self.tiempos_modelo is None and self.error is None:
+            self._recibir(0)
+        return self.tiempos_modelo is not None or self.error is not None
+
+    def abrir_camara(self, camera_id=0, fps=30, resolution=(1280, 720), timeout=60,
+                     backend=BACKEND_SOLUCIONES, ruta_modelo=None):
+        """Abre la cámara en el motor y conecta la memoria compartida.
+
+        backend y ruta_modelo se pasan a AdquisicionDataCamara ('soluciones' usa el modelo precargado).
+        """
+        self.camera_id = camera_id
+        self.fps = fps
+        self.resolution = resolution
+        self._enviar('abrir_camara', {'camera_id': camera_id, 'fps': fps, 'resolution': resolution,
+                                      'backend': backend, 'ruta_modelo': ruta_modelo})
+
+        # Espera el modelo (normalmente ya precargado) y la apertura de la cámara.
+        limite = time.time() + timeout
+        info = None
+        while self.error is None and info is None:
+            restante = limite - time.time()
+            if restante <= 0:
+                raise Exception("El motor de captura no respondió a tiempo")
+            mensaje = self._recibir(restante)
+            if mensaje is not None and mensaje[0] == 'listo':
+                info = mensaje[1]
+        if self.error is not None:
+            raise Exception(self.error)
+
+        self.frames = FrameCompartido(info['forma_frame'], nombre=info['frame'])
+        self.anillo_visual = AnilloCompartido(CAPACIDAD_VISUAL, len(CAMPOS_VISUALES), nombre=info['visual'])
+        self.anillo_imu = AnilloCompartido(CAPACIDAD_IMU, len(CAMPOS_IMU), nombre=info['imu'])
+        self.simulador_imu = ProxySimuladorIMU(self, self.imu_sample_rate)
+        logger.info(f"Motor de captura conectado (PID {self.proceso.pid})")
+
+    def _enviar(self, comando, argumento=None):
+        self.conexion.send((comando, argumento))
+
+    @staticmethod
+    def _filas_a_muestras(filas, campos):
+        muestras = [dict(zip(campos, fila)) for fila in filas.tolist()]
+        for muestra in muestras:
+            for campo in CAMPOS_ENTEROS:
+                if campo in muestra and muestra[campo] == muestra[campo]:
+                    muestra[campo] = int(muestra[campo])
+        return muestras
+
+    def comenzar_grabacion(self):
+        self.is_recording = True
+        self._enviar('iniciar')
+        logger.info("Grabación visual iniciada (motor separado)")
+
+    def detener_grabacion(self):
+        self.is_recording = False
+        self._enviar('detener')
+        logger.info("Grabación visual detenida (motor separado)")
+
+    def iniciar_grabacion_video(self, filename=None, timeout=5):
+        self._enviar('iniciar_video', filename)
+        limite = time.time() + timeout
+        while self.error is None:
+            restante = limite - time.time()
+            if restante <= 0:
+                logger.error("El motor de captura no confirmó la grabación de video")
+                return False
+            mensaje = self._recibir(restante)
+            if mensaje is not None and mensaje[0] == 'video':
+                return mensaje[1]
+        return False
+
+    def obtener_datos_visuales(self):
+        return self._filas_a_muestras(self.anillo_visual.leer(), CAMPOS_VISUALES)
+
+    def obtener_ultima_muestra(self):
+        filas = self.anillo_visual.leer(ultimas=1)
+        if len(filas) == 0:
+            return None
+        return self._filas_a_muestras(filas, CAMPOS_VISUALES)[0]
+
+    def contar_muestras_visuales(self):
+        return min(self.anillo_visual.total(), CAPACIDAD_VISUAL)
+
+    def obtener_frame_actual(self):
+        return self.aplicar_a_frame_actual(np.copy)
+
+    def aplicar_a_frame_actual(self, funcion):
+        """
+        Aplica 'funcion' directamente sobre el frame en memoria compartida (sin copia)
+        Returns:
+            El resultado de 'funcion', o None si no hay frame o el motor lo
+            sobrescribió mientras se usaba.
+        """
+        vista, secuencia = self.frames.leer()
+        if vista is None:
+            return None
+        resultado = funcion(vista)
+        if not self.frames.sigue_valido(secuencia):
+            return None
+        return resultado
+
+    def cerrar(self):
+        """Detiene el motor y libera la memoria compartida."""
+        if self.proceso is None:
+            return
+        try:
+            self._enviar('salir')
+        except (BrokenPipeError, OSError):
+            pass
+        self.proceso.join(timeout=5)
+        if self.proceso.is_alive():
+            self.proceso.terminate()
+        if self.frames is not None:
+            self.frames.cerrar()
+            self.anillo_visual.cerrar()
+            self.anillo_imu.cerrar()
+            self.frames = None
+        self.conexion.close()
+        self.proceso = None
+
+
+class ProxySimuladorIMU:
+    """Interfaz de Simulador_IMU para el simulador que corre en el motor."""
+
+    def __init__(self, cliente, sample_rate):
+        self.cliente = cliente
+        self.sample_rate = sample_rate
+        self.is_recording = False
+        # Ubicación de cada sensor según la configuración del simulador.
+        self.ubicaciones = {sensor_id: config['location']
+                            for sensor_id, config in Simulador_IMU().sensor_config.items()}
+
+    def comenzar_grabacion(self, camera_system=None):
+        self.is_recording = True
+        self.cliente._enviar('iniciar_imu')
+        logger.info("Simulación IMU iniciada (motor separado)")
+
+    def detener_grabacion(self):
+        self.is_recording = False
+        self.cliente._enviar('detener_imu')
+        logger.info("Simulación IMU detenida (motor separado)")
+
+    def obtener_datos_imu(self):
+        muestras = []
+        # Reconstruye el mismo orden de campos que Simulador_IMU.generar_datos_sensor.
+        for muestra in self.cliente._filas_a_muestras(self.cliente.anillo_imu.leer(), CAMPOS_IMU):
+            muestras.append({
+                'timestamp': muestra['timestamp'],
+                'sensor_id': muestra['sensor_id'],
+                'location': self.ubicaciones.get(muestra['sensor_id'], ''),
+                **{campo: muestra[campo] for campo in CAMPOS_IMU[2:]},
+                'system_timestamp': muestra['timestamp']
+            })
+        return muestras
@@ -0,0 +1,1142 @@
+"""
+NÚCLEO DE ADQUISICIÓN: CÁMARA + SIMULACIÓN IMU
+================================================================
+
+Clases de adquisición visual y de simulación inercial del sistema de
+análisis biomecánico para salto largo. Se mantienen en un módulo importable
+(y no dentro del notebook) para que el motor de captura pueda ejecutarse en
+un proceso independiente de la interfaz gráfica (ver Motor_compartido.py).
+
+Autor: Daniel Andres Ramirez Segura
+"""
+
+# cv2: Librería OpenCV para captura y manipulación de video desde la cámara.
+import cv2
+# np: NumPy para operaciones matemáticas y manejo de arrays numéricos, esencial para cálculos biomecánicos.
+import numpy as np
+# threading: Para ejecutar procesos en hilos paralelos, como la captura de video sin bloquear la interfaz gráfica.
+import threading
+# time: Para manejar tiempos, delays y timestamps en la captura de datos.
+import time
+# datetime: Para generar timestamps y nombres de archivos basados en fechas.
+from datetime import datetime
+# deque: Estructura de cola doblemente terminada de collections, usada para buffers circulares de datos (eficiente en memoria).
+from collections import deque
+# logging: Para registrar eventos, errores y mensajes del sistema de manera estructurada.
+import logging
+# importlib y sys: Para importar módulos pesados (MediaPipe, matplotlib, pandas) solo cuando se usan.
+import importlib
+import sys
+
+# crear_backend: Crea el backend de pose síncrono (mp.solutions) o asíncrono (PoseLandmarker LIVE_STREAM).
+# Backend_pose.py está en Prototipo_prueba_mediapipe; el punto de entrada (el notebook) agrega esa carpeta al path.
+from Backend_pose import BACKEND_SOLUCIONES, crear_backend
+
+# Logger del módulo (la configuración la hace la aplicación principal).
+logger = logging.getLogger(__name__)
+
+# Tiempos de importación y de carga del modelo en segundos, para diagnosticar el arranque.
+TIEMPOS_ARRANQUE = {}
+
+
+def importar_perezoso(nombre):
+    """Importa un módulo la primera vez que se necesita y registra cuánto tardó."""
+    # Si ya está importado, no hay costo adicional.
+    if nombre in sys.modules:
+        return sys.modules[nombre]
+    inicio = time.perf_counter()
+    modulo = importlib.import_module(nombre)
+    TIEMPOS_ARRANQUE[f"import {nombre}"] = time.perf_counter() - inicio
+    return modulo
+
+
+def crear_modelo_pose():
+    """Crea el modelo de pose de MediaPipe con la configuración del sistema."""
+    mp = importar_perezoso('mediapipe')
+    # Inicializa el modelo de detección de pose con parámetros específicos:
+    # - static_image_mode=False: Para video en tiempo real.
+    # - model_complexity=2: Alta complejidad para precisión.
+    # - enable_segmentation=False: No segmenta el fondo.
+    # - min_detection_confidence=0.7: Confianza mínima para detección inicial.
+    # - min_tracking_confidence=0.8: Confianza mínima para seguimiento.
+    return mp.solutions.pose.Pose(
+        static_image_mode=False,
+        model_complexity=2,
+        enable_segmentation=False,
+        min_detection_confidence=0.7,
+        min_tracking_confidence=0.8
+    )
+
+
+def calentar_modelo_pose(pose):
+    """Ejecuta una inferencia sobre un frame vacío para que la primera captura real no pague la inicialización."""
+    pose.process(np.zeros((480, 640, 3), dtype=np.uint8))
+
+
+# =============================================================================
+# CARGA DEL MODELO EN SEGUNDO PLANO
+# =============================================================================
+
+class CargadorPose:
+    """
+    CARGA Y CALENTAMIENTO DEL MODELO DE POSE EN UN HILO DE FONDO
+
+    Importar MediaPipe y construir el modelo toma varios segundos. Esta clase
+    lo hace en segundo plano para que la interfaz aparezca de inmediato; el
+    evento 'listo' indica cuándo el modelo puede usarse.
+    """
+
+    def __init__(self):
+        # Evento que se activa cuando termina la carga (con o sin error).
+        self.listo = threading.Event()
+        # Modelo cargado.
+        self.pose = None
+        # Error de carga, si lo hubo.
+        self.error = None
+        # Hilo de carga (daemon para no impedir el cierre de la aplicación).
+        self.hilo = threading.Thread(target=self._cargar, daemon=True)
+
+    def iniciar(self):
+        """Inicia la carga en segundo plano y retorna el propio cargador."""
+        self.hilo.start()
+        return self
+
+    def _cargar(self):
+        try:
+            inicio = time.perf_counter()
+            pose = crear_modelo_pose()
+            TIEMPOS_ARRANQUE['crear modelo pose'] = time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            calentar_modelo_pose(pose)
+            TIEMPOS_ARRANQUE['calentamiento modelo pose'] = time.perf_counter() - inicio
+            self.pose = pose
+            logger.info("Modelo de pose cargado y precalentado")
+        except Exception as e:
+            self.error = e
+            logger.error(f"Error cargando modelo de pose: {e}")
+        finally:
+            self.listo.set()
+
+    def obtener(self, timeout=None):
+        """Espera a que el modelo esté listo y lo retorna."""
+        if not self.listo.wait(timeout):
+            raise Exception("El modelo de pose no terminó de cargar a tiempo")
+        if self.error is not None:
+            raise self.error
+        return self.pose
+
+
+# =============================================================================
+# CLASE PRINCIPAL: ADQUISICIÓN DE DATOS VISUALES
+# =============================================================================
+
+class AdquisicionDataCamara:
+    """
+    CLASE PARA ADQUISICIÓN Y PROCESAMIENTO DE DATOS VISUALES
+    
+    Esta clase es el núcleo del análisis visual del sistema. Se encarga de:
+    - Capturar video desde la cámara del computador
+    - Procesar cada frame con MediaPipe para detectar poses humanas
+    - Calcular métricas biomecánicas específicas del salto largo
+    - Almacenar datos en buffers circulares para análisis en tiempo real
+    
+    FUNCIONAMIENTO:
+    1. Inicializa la cámara con resolución y FPS específicos
+    2. Cada frame capturado se procesa con MediaPipe
+    3. Se extraen 33 puntos clave del cuerpo humano
+    4. Se calculan métricas biomecánicas derivadas
+    5. Los datos se almacenan para análisis posterior
+
+    Jerarquía: Esta clase es independiente pero se integra con la interfaz gráfica (Interfaz_Biomecanica) 
+    para control y visualización. Es el componente base para el análisis visual, y se ejecuta en un hilo 
+    separado para no bloquear la GUI. End-users: Entiendan que esta clase maneja la cámara y procesa 
+    los frames en tiempo real; si hay problemas con la cámara, revisen aquí.
+    """
+
+    # Constructor de la clase: Inicializa parámetros y componentes.
+    # camera_id: ID de la cámara (por defecto 0, la cámara principal).
+    # fps: Frames por segundo deseados.
+    # resolution: Resolución del video (ancho, alto).
+    # pose: Modelo de pose ya cargado (p. ej. por CargadorPose); si es None se crea aquí.
+    # backend: 'soluciones' (mp.solutions.pose, síncrono) o 'tareas' (PoseLandmarker LIVE_STREAM, asíncrono).
+    # ruta_modelo: Archivo .task de PoseLandmarker (solo para el backend 'tareas').
+    def __init__(self, camera_id=0, fps=30, resolution=(1280, 720), pose=None,
+                 backend=BACKEND_SOLUCIONES, ruta_modelo=None):
+        # Asigna el ID de la cámara.
+        self.camera_id = camera_id
+        # Asigna los FPS deseados.
+        self.fps = fps
+        # Asigna la resolución deseada.
+        self.resolution = resolution
+        # Bandera para indicar si se está grabando.
+        self.is_recording = False
+        # Bandera para mostrar previsualización de video.
+        self.show_preview = True
+        # Objeto para escribir video (inicialmente None).
+        self.video_writer = None
+        # Nombre del archivo de video (inicialmente None).
+        self.video_filename = None
+        # Frame actual procesado.
+        self.current_frame = None
+        # Importa MediaPipe (sin costo si ya lo cargó CargadorPose).
+        mp = importar_perezoso('mediapipe')
+        # Carga el módulo de pose de MediaPipe.
+        self.mp_pose = mp.solutions.pose
+        # Carga el módulo de dibujo de MediaPipe para visualizar landmarks.
+        self.mp_drawing = mp.solutions.drawing_utils
+        # Estilos de dibujo de landmarks y conexiones, creados una sola vez (no en cada frame).
+        self.landmark_spec = self.mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2)
+        self.connection_spec = self.mp_drawing.DrawingSpec(color=(255, 0, 0), thickness=2)
+        # Crea el backend de inferencia. Con 'soluciones' usa el modelo precargado si se entregó;
+        # si no, lo crea ahora. Con 'tareas' carga el modelo .task de PoseLandmarker.
+        if backend == BACKEND_SOLUCIONES:
+            self.backend = crear_backend(backend, pose=pose if pose is not None else crear_modelo_pose())
+        else:
+            self.backend = crear_backend(backend, ruta_modelo=ruta_modelo,
+                                         min_detection_confidence=0.7, min_tracking_confidence=0.8)
+        # Buffer circular para datos visuales (máximo 5000 muestras para optimizar memoria).
+        self.visual_data_buffer = deque(maxlen=5000)  # Reducido para mejor rendimiento
+        # Buffer circular para frames procesados (máximo 30 para previsualización).
+        self.frame_buffer = deque(maxlen=30)  # Reducido para optimizar memoria
+        # Función opcional que recibe (muestra, frame) tras cada frame capturado.
+        # La usa el motor en proceso separado para publicar en memoria compartida.
+        self.publicador = None
+        # Llama al método para inicializar la cámara.
+        self.iniciar_camara()
+
+    # Método para inicializar la captura de video desde la cámara.
+    def iniciar_camara(self):
+        # Bloque try para manejar errores en la inicialización.
+        try:
+            # Crea el objeto de captura de video con el ID especificado.
+            self.cap = cv2.VideoCapture(self.camera_id)
+            # Verifica si la cámara se abrió correctamente.
+            if not self.cap.isOpened():
+                # Lanza excepción si no se puede abrir.
+                raise Exception(f"No se puede abrir la cámara {self.camera_id}")
+            # Configura el ancho del frame.
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.resolution[0])
+            # Configura el alto del frame.
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.resolution[1])
+            # Configura los FPS deseados.
+            self.cap.set(cv2.CAP_PROP_FPS, self.fps)
+            # Configura el buffer de la cámara a 1 para minimizar latencia.
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            # Obtiene los FPS reales configurados.
+            actual_fps = self.cap.get(cv2.CAP_PROP_FPS)
+            # Obtiene el ancho real.
+            actual_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            # Obtiene el alto real.
+            actual_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            # Registra información sobre la configuración real de la cámara.
+            logger.info(f"Cámara inicializada: {actual_width}x{actual_height} @ {actual_fps} FPS")
+        # Maneja excepciones en la inicialización.
+        except Exception as e:
+            # Registra el error.
+            logger.error(f"Error inicializando cámara: {e}")
+            # Relanza la excepción para manejo superior.
+            raise
+
+    # Método para procesar un frame individual con MediaPipe (inferencia síncrona).
+    def procesar_frame_mediapipe(self, frame):
+        # Bloque try para manejar errores en la inferencia.
+        try:
+            # Procesa el frame con MediaPipe una sola vez; el resultado sirve
+            # para el video grabado, los datos y la previsualización.
+            results = self.backend.procesar(frame)
+        # Maneja excepciones en la inferencia.
+        except Exception as e:
+            # Registra el error.
+            logger.error(f"Error procesando frame: {e}")
+            # Retorna datos vacíos en caso de error.
+            return self._get_empty_landmarks()
+        # Analiza el resultado del frame.
+        return self.procesar_resultado_pose(frame, results)
+
+    # Método para analizar el resultado de pose de un frame (dibujo, video, landmarks y métricas).
+    def procesar_resultado_pose(self, frame, results):
+        # Bloque try para manejar errores en el procesamiento.
+        try:
+            # Copia el frame original para modificaciones.
+            self.current_frame = frame.copy()
+            # Indica si se está grabando video y el writer está abierto.
+            grabando_video = self.video_writer is not None and self.video_writer.isOpened()
+            # Dibuja los landmarks si se usan en el video o en la previsualización.
+            if results.pose_landmarks and (grabando_video or self.show_preview):
+                # Dibuja los landmarks y conexiones con los estilos en caché.
+                self.mp_drawing.draw_landmarks(
+                    self.current_frame,
+                    results.pose_landmarks,
+                    self.mp_pose.POSE_CONNECTIONS,
+                    landmark_drawing_spec=self.landmark_spec,
+                    connection_drawing_spec=self.connection_spec
+                )
+            # Escribe el frame en el video (con landmarks, sin el centro de masa).
+            if grabando_video:
+                self.video_writer.write(self.current_frame)
+            # Diccionario para almacenar datos de landmarks.
+            landmarks_data = {}
+            # Si se detectan landmarks:
+            if results.pose_landmarks:
+                # Obtiene la lista de landmarks.
+                landmarks = results.pose_landmarks.landmark
+                # Itera sobre los 33 landmarks estándar de MediaPipe.
+                for idx, landmark in enumerate(landmarks):
+                    # Almacena coordenada X normalizada.
+                    landmarks_data[f'landmark_{idx}_x'] = landmark.x
+                    # Almacena coordenada Y normalizada.
+                    landmarks_data[f'landmark_{idx}_y'] = landmark.y
+                    # Almacena coordenada Z relativa.
+                    landmarks_data[f'landmark_{idx}_z'] = landmark.z
+                    # Almacena visibilidad (confianza) del landmark.
+                    landmarks_data[f'landmark_{idx}_visibility'] = landmark.visibility
+                # Calcula métricas biomecánicas a partir de los landmarks.
+                bio_metrics = self.calcular_metricas_biomecanicas(landmarks)
+                # Actualiza el diccionario con las métricas biomecánicas.
+                landmarks_data.update(bio_metrics)
+                # Calcula métricas de calidad de la detección.
+                quality_metrics = self.calcular_metricas_de_calidad(landmarks)
+                # Actualiza el diccionario con métricas de calidad.
+                landmarks_data.update(quality_metrics)
+                # Si se debe mostrar previsualización:
+                if self.show_preview:
+                    # Los landmarks ya se dibujaron arriba; dibuja el centro de masa si está calculado.
+                    if 'center_of_mass_x' in bio_metrics and 'center_of_mass_y' in bio_metrics:
+                        self.dibujar_centro_de_masa(self.current_frame, bio_metrics['center_of_mass_x'], bio_metrics['center_of_mass_y'])                
+                    # Agrega el frame procesado al buffer.
+                    self.frame_buffer.append(self.current_frame.copy())
+            # Si no se detectan landmarks, usa valores vacíos.
+            else:
+                landmarks_data = self._get_empty_landmarks()
+            # Retorna los datos procesados.
+            return landmarks_data
+        # Maneja excepciones en el procesamiento.
+        except Exception as e:
+            # Registra el error.
+            logger.error(f"Error procesando frame: {e}")
+            # Retorna datos vacíos en caso de error.
+            return self._get_empty_landmarks()
+
+    # Método privado para obtener un diccionario de landmarks vacío con NaN.
+    def _get_empty_landmarks(self):
+        # Inicializa diccionario vacío.
+        landmarks_data = {}
+        # Para cada uno de los 33 landmarks:
+        for idx in range(33):
+            # Asigna NaN a coordenadas X, Y, Z.
+            landmarks_data[f'landmark_{idx}_x'] = np.nan
+            landmarks_data[f'landmark_{idx}_y'] = np.nan
+            landmarks_data[f'landmark_{idx}_z'] = np.nan
+            # Asigna 0 a visibilidad.
+            landmarks_data[f'landmark_{idx}_visibility'] = 0.0
+        # Agrega métricas biomecánicas vacías con NaN o 0.
+        landmarks_data.update({
+            'detection_confidence': 0.0,
+            'detection_completeness': 0.0,
+            'valid_landmarks': 0,
+            'center_of_mass_x': np.nan,
+            'center_of_mass_y': np.nan,
+            'knee_angle_right': np.nan,
+            'knee_angle_left': np.nan,
+            'trunk_angle': np.nan,
+            'hip_height': np.nan,
+            'symmetry_index': 0.0,
+            'velocity_x_estimated': 0.0
+        })
+        # Retorna el diccionario vacío.
+        return landmarks_data
+
+    # Método para calcular métricas biomecánicas específicas del salto largo.
+    def calcular_metricas_biomecanicas(self, landmarks):
+        # Diccionario para métricas.
+        metrics = {}
+        # Bloque try para manejar errores en cálculos.
+        try:
+            # Calcula centro de masa (COM) en X e Y.
+            com_x, com_y = self.calcular_centro_de_masa(landmarks)
+            # Almacena COM X.
+            metrics['center_of_mass_x'] = com_x
+            # Almacena COM Y.
+            metrics['center_of_mass_y'] = com_y
+            # Calcula ángulo de rodilla derecha usando landmarks 24,26,28 (cadera, rodilla, tobillo).
+            knee_angle_r = self.calcular_angulo_articular(landmarks[24], landmarks[26], landmarks[28])
+            # Almacena ángulo rodilla derecha.
+            metrics['knee_angle_right'] = knee_angle_r
+            # Calcula ángulo de rodilla izquierda usando landmarks 23,25,27.
+            knee_angle_l = self.calcular_angulo_articular(landmarks[23], landmarks[25], landmarks[27])
+            # Almacena ángulo rodilla izquierda.
+            metrics['knee_angle_left'] = knee_angle_l
+            # Calcula ángulo del tronco.
+            trunk_angle = self.calcular_angulo_tronco(landmarks)
+            # Almacena ángulo tronco.
+            metrics['trunk_angle'] = trunk_angle
+            # Calcula altura de cadera como promedio invertido de Y de caderas (normalizado).
+            hip_height = (landmarks[23].y + landmarks[24].y) / 2
+            # Almacena altura de cadera (1 - y para que más alto sea mayor valor).
+            metrics['hip_height'] = 1.0 - hip_height
+            # Calcula índice de simetría bilateral.
+            symmetry_index = self.calcular_simetria_bilateral(landmarks)
+            # Almacena simetría.
+            metrics['symmetry_index'] = symmetry_index
+            # Si hay datos previos en el buffer:
+            if len(self.visual_data_buffer) > 0:
+                # Obtiene COM X previo.
+                prev_com_x = self.visual_data_buffer[-1].get('center_of_mass_x', com_x)
+                # Calcula delta de tiempo basado en FPS.
+                time_delta = 1.0 / self.fps
+                # Estima velocidad en X como cambio en COM / delta tiempo.
+                velocity_x = (com_x - prev_com_x) / time_delta if time_delta > 0 else 0
+                # Almacena velocidad estimada.
+                metrics['velocity_x_estimated'] = velocity_x
+            # Si no hay datos previos, velocidad 0.
+            else:
+                metrics['velocity_x_estimated'] = 0.0
+        # Maneja excepciones en cálculos.
+        except Exception as e:
+            # Registra advertencia.
+            logger.warning(f"Error calculando métricas biomecánicas: {e}")
+        # Retorna las métricas.
+        return metrics
+
+    def dibujar_centro_de_masa(self, frame, com_x, com_y):
+            # Convierte coordenadas normalizadas a píxeles
+            height, width = frame.shape[:2]
+            com_x_px = int(com_x * width)
+            com_y_px = int(com_y * height)
+            # Dibuja punto en el centro de masa
+            cv2.circle(frame, (com_x_px, com_y_px), 5, (0, 0, 255), -1)  # Punto rojo
+            # Añade etiqueta
+            cv2.putText(frame, "centro de masa", (com_x_px + 10, com_y_px - 10), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
+
+    # Método para calcular el centro de masa aproximado usando pesos segmentales.
+    def calcular_centro_de_masa(self, landmarks):
+        # Diccionario de pesos relativos de segmentos corporales (aproximados para modelo biomecánico).
+        segment_weights = {
+            'head': 0.08, 'trunk': 0.50, 'arms': 0.10, 'thighs': 0.20, 'shanks': 0.12
+        }
+        # Calcula posición media de cabeza (landmark 0).
+        head_x, head_y = landmarks[0].x, landmarks[0].y
+        # Calcula posición media de tronco (promedio de hombros y caderas: 11,12,23,24).
+        trunk_x = (landmarks[11].x + landmarks[12].x + landmarks[23].x + landmarks[24].x) / 4
+        trunk_y = (landmarks[11].y + landmarks[12].y + landmarks[23].y + landmarks[24].y) / 4
+        # Calcula posición media de brazos (promedio de codos y muñecas: 13,14,15,16).
+        arms_x = (landmarks[13].x + landmarks[14].x + landmarks[15].x + landmarks[16].x) / 4
+        arms_y = (landmarks[13].y + landmarks[14].y + landmarks[15].y + landmarks[16].y) / 4
+        # Calcula posición media de muslos (promedio de rodillas: 25,26).
+        thighs_x = (landmarks[25].x + landmarks[26].x) / 2
+        thighs_y = (landmarks[25].y + landmarks[26].y) / 2
+        # Calcula posición media de piernas inferiores (promedio de tobillos: 27,28).
+        shanks_x = (landmarks[27].x + landmarks[28].x) / 2
+        shanks_y = (landmarks[27].y + landmarks[28].y) / 2
+        # Calcula COM ponderado en X sumando peso * posición.
+        com_x = sum(segment_weights[k] * v for k, v in zip(segment_weights, [head_x, trunk_x, arms_x, thighs_x, shanks_x]))
+        # Calcula COM ponderado en Y de manera similar.
+        com_y = sum(segment_weights[k] * v for k, v in zip(segment_weights, [head_y, trunk_y, arms_y, thighs_y, shanks_y]))
+        # Retorna COM X e Y.
+        return com_x, com_y
+
+    # Método para calcular ángulo entre tres puntos (usando ley del coseno).
+    def calcular_angulo_articular(self, point1, point2, point3):
+        # Bloque try para manejar errores.
+        try:
+            # Convierte puntos a arrays NumPy para vectores.
+            a = np.array([point1.x, point1.y])
+            b = np.array([point2.x, point2.y])
+            c = np.array([point3.x, point3.y])
+            # Vector BA.
+            ba = a - b
+            # Vector BC.
+            bc = c - b
+            # Calcula coseno del ángulo usando producto punto.
+            cosine_angle = np.dot(ba, bc) / (np.linalg.norm(ba) * np.linalg.norm(bc))
+            # Limita el coseno entre -1 y 1 para evitar errores numéricos.
+            cosine_angle = np.clip(cosine_angle, -1.0, 1.0)
+            # Calcula ángulo en radianes.
+            angle = np.arccos(cosine_angle)
+            # Convierte a grados y retorna.
+            return np.degrees(angle)
+        # En caso de error (ej. división por cero), retorna NaN.
+        except:
+            return np.nan
+
+    # Método para calcular ángulo del tronco respecto a la vertical.
+    def calcular_angulo_tronco(self, landmarks):
+        # Bloque try para manejar errores.
+        try:
+            # Posición media de hombros (11,12).
+            shoulder_mid_x = (landmarks[11].x + landmarks[12].x) / 2
+            shoulder_mid_y = (landmarks[11].y + landmarks[12].y) / 2
+            # Posición media de caderas (23,24).
+            hip_mid_x = (landmarks[23].x + landmarks[24].x) / 2
+            hip_mid_y = (landmarks[23].y + landmarks[24].y) / 2
+            # Vector del tronco (de hombros a caderas).
+            trunk_vector = np.array([hip_mid_x - shoulder_mid_x, hip_mid_y - shoulder_mid_y])
+            # Vector vertical de referencia.
+            vertical_vector = np.array([0, 1])
+            # Calcula coseno del ángulo entre tronco y vertical.
+            cosine_angle = np.dot(trunk_vector, vertical_vector) / (
+                np.linalg.norm(trunk_vector) * np.linalg.norm(vertical_vector)
+            )
+            # Limita coseno.
+            cosine_angle = np.clip(cosine_angle, -1.0, 1.0)
+            # Calcula ángulo en radianes.
+            angle = np.arccos(cosine_angle)
+            # Convierte a grados y retorna.
+            return np.degrees(angle)
+        # En caso de error, retorna NaN.
+        except:
+            return np.nan
+
+    # Método para calcular simetría bilateral basada en posiciones de rodillas y tobillos.
+    def calcular_simetria_bilateral(self, landmarks):
+        # Bloque try para manejar errores.
+        try:
+            # Posición Y de rodilla izquierda (25).
+            left_knee_y = landmarks[25].y
+            # Posición Y de rodilla derecha (26).
+            right_knee_y = landmarks[26].y
+            # Posición Y de tobillo izquierdo (27).
+            left_ankle_y = landmarks[27].y
+            # Posición Y de tobillo derecho (28).
+            right_ankle_y = landmarks[28].y
+            # Diferencia absoluta en rodillas.
+            knee_diff = abs(left_knee_y - right_knee_y)
+            # Diferencia absoluta en tobillos.
+            ankle_diff = abs(left_ankle_y - right_ankle_y)
+            # Calcula simetría como 100 * (1 - promedio de diferencias).
+            symmetry = 100 * (1 - (knee_diff + ankle_diff) / 2)
+            # Retorna máximo entre 0 y simetría (para evitar negativos).
+            return max(0, symmetry)
+        # En caso de error, retorna 0.
+        except:
+            return 0.0
+
+    # Método para calcular métricas de calidad de la detección.
+    def calcular_metricas_de_calidad(self, landmarks):
+        # Bloque try para manejar errores.
+        try:
+            # Landmarks clave para salto largo (hombros, caderas, rodillas, tobillos).
+            key_landmarks = [11, 12, 13, 14, 23, 24, 25, 26, 27, 28]
+            # Lista de visibilidades de landmarks clave.
+            confidences = [landmarks[i].visibility for i in key_landmarks]
+            # Confianza promedio.
+            avg_confidence = np.mean(confidences)
+            # Conteo de landmarks válidos (visibilidad > 0.5).
+            valid_landmarks = sum(1 for conf in confidences if conf > 0.5)
+            # Completitud como proporción de válidos.
+            completeness = valid_landmarks / len(key_landmarks)
+            # Retorna diccionario con métricas.
+            return {
+                'detection_confidence': avg_confidence,
+                'detection_completeness': completeness,
+                'valid_landmarks': valid_landmarks
+            }
+        # En caso de error, retorna valores cero.
+        except:
+            return {
+                'detection_confidence': 0.0,
+                'detection_completeness': 0.0,
+                'valid_landmarks': 0
+            }
+
+    # Método principal para capturar datos visuales en un bucle mientras se graba.
+    def capturar_datos_visuales(self):
+        # Contador de frames analizados (número de muestra).
+        frame_count = 0
+        # Contador de frames leídos de la cámara (para mantener los FPS).
+        frames_leidos = 0
+        # Timestamp de inicio.
+        start_time = time.time()
+        # Bucle mientras se esté grabando.
+        while self.is_recording:
+            # Lee un frame de la cámara.
+            ret, frame = self.cap.read()
+            # Si se leyó correctamente:
+            if ret:
+                # Obtiene timestamp actual.
+                timestamp = time.time()
+                frames_leidos += 1
+                # Con el backend asíncrono el frame se envía sin esperar y se analizan los
+                # resultados ya disponibles (de frames anteriores), en orden de captura.
+                if self.backend.asincrono:
+                    try:
+                        if not self.backend.ocupado():
+                            self.backend.enviar(frame, timestamp)
+                        listos = self.backend.obtener_resultados()
+                    except Exception as e:
+                        logger.error(f"Error procesando frame: {e}")
+                        listos = []
+                # Con el backend síncrono el frame se procesa en el acto.
+                else:
+                    listos = [(frame, timestamp, None)]
+                # Recorre cada frame con resultado junto a su timestamp de captura.
+                for frame_listo, timestamp, results in listos:
+                    # Ignora resultados de frames capturados antes de esta grabación.
+                    if timestamp < start_time:
+                        continue
+                    # Procesa el frame con MediaPipe (o analiza el resultado ya recibido).
+                    if results is None:
+                        landmarks_data = self.procesar_frame_mediapipe(frame_listo)
+                    else:
+                        landmarks_data = self.procesar_resultado_pose(frame_listo, results)
+                    # Crea diccionario de muestra visual con timestamp y datos.
+                    visual_sample = {
+                        'timestamp': timestamp,
+                        'frame_number': frame_count,
+                        'elapsed_time': timestamp - start_time,
+                        **landmarks_data
+                    }
+                    # Agrega la muestra al buffer.
+                    self.visual_data_buffer.append(visual_sample)
+                    # Publica la muestra y el frame procesado si hay un publicador.
+                    if self.publicador is not None:
+                        self.publicador(visual_sample, self.current_frame)
+                    # Incrementa contador de frames.
+                    frame_count += 1
+                # Calcula tiempo esperado para el próximo frame (para mantener FPS).
+                expected_time = start_time + (frames_leidos / self.fps)
+                # Tiempo actual.
+                current_time = time.time()
+                # Tiempo de sleep para sincronizar.
+                sleep_time = expected_time - current_time
+                # Si positivo, duerme.
+                if sleep_time > 0:
+                    time.sleep(sleep_time)
+            # Si no se leyó frame, advierte y duerme brevemente.
+            else:
+                logger.warning("No se pudo capturar frame de la cámara")
+                time.sleep(0.1)
+        # Descarta los frames que quedaron en inferencia para que no aparezcan en la próxima grabación.
+        self.backend.descartar_pendientes()
+
+    # Método para obtener el último frame del buffer.
+    def obtener_ultimo_frame(self):
+        # Si hay frames, retorna el último.
+        if self.frame_buffer:
+            return self.frame_buffer[-1]
+        # Sino, None.
+        return None
+
+    # Método para comenzar la grabación en un hilo separado.
+    def comenzar_grabacion(self):
+        # Activa bandera de grabación.
+        self.is_recording = True
+        # Crea hilo para captura visual (daemon para que termine con el programa).
+        self.hilo_visual = threading.Thread(target=self.capturar_datos_visuales, daemon=True)
+        # Inicia el hilo.
+        self.hilo_visual.start()
+        # Registra inicio.
+        logger.info("Grabación visual iniciada")
+
+    # Método para detener la grabación.
+    def detener_grabacion(self):
+        # Desactiva bandera.
+        self.is_recording = False
+        # Si existe el hilo, espera a que termine (timeout 2s).
+        if hasattr(self, 'hilo_visual'):
+            self.hilo_visual.join(timeout=2)
+        # Si existe writer de video, lo libera.
+        if self.video_writer:
+            self.video_writer.release()
+            self.video_writer = None
+            # Registra guardado de video.
+            logger.info(f"Video guardado: {self.video_filename}")
+        # Registra detención.
+        logger.info("Grabación visual detenida")
+
+    # Método para obtener todos los datos visuales del buffer como lista.
+    def obtener_datos_visuales(self):
+        return list(self.visual_data_buffer)
+
+    # Método para obtener solo la muestra más reciente (sin copiar todo el buffer).
+    def obtener_ultima_muestra(self):
+        return self.visual_data_buffer[-1] if self.visual_data_buffer else None
+
+    # Método para obtener el número de muestras en el buffer.
+    def contar_muestras_visuales(self):
+        return len(self.visual_data_buffer)
+
+    # Método para obtener el frame actual.
+    def obtener_frame_actual(self):
+        return self.current_frame
+
+    # Método para aplicar una función al frame actual (misma interfaz que ClienteMotorCompartido).
+    def aplicar_a_frame_actual(self, funcion):
+        frame = self.current_frame
+        # Si no hay frame, retorna None.
+        if frame is None:
+            return None
+        return funcion(frame)
+
+    # Método para iniciar grabación de video a archivo.
+    def iniciar_grabacion_video(self, filename=None):
+        # Si no se da nombre, genera uno con timestamp.
+        if filename is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"salto_largo_{timestamp}.mp4"
+        # Asigna nombre de archivo.
+        self.video_filename = filename
+        # Codec para MP4.
+        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+        # Crea writer de video con codec, FPS y resolución.
+        self.video_writer = cv2.VideoWriter(
+            filename,
+            fourcc,
+            self.fps,
+            self.resolution
+        )
+        # Si no se abre, registra error y retorna False.
+        if not self.video_writer.isOpened():
+            logger.error(f"No se pudo crear el archivo de video: {filename}")
+            self.video_writer = None
+            return False
+        # Registra inicio de grabación video.
+        logger.info(f"Grabación de video iniciada: {filename}")
+        return True
+
+    # Destructor: Libera recursos al destruir la instancia.
+    def __del__(self):
+        # Libera writer si existe.
+        if hasattr(self, 'video_writer') and self.video_writer:
+            self.video_writer.release()
+        # Libera captura de cámara si existe.
+        if hasattr(self, 'cap'):
+            self.cap.release()
+
+# =============================================================================
+# CLASE 2: SIMULACIÓN DE SENSORES IMU
+# =============================================================================
+class Simulador_IMU:
+    """
+    SIMULADOR DE SENSORES INERCIALES (IMU) PARA DESARROLLO
+    
+    Esta clase simula el comportamiento de 11 sensores ICM-20948 distribuidos
+    estratégicamente en el cuerpo del atleta. La simulación se basa en:
+    
+    FUNCIONAMIENTO:
+    1. Recibe datos del análisis visual (poses, movimientos)
+    2. Simula señales de acelerómetro, giroscopio y magnetómetro
+    3. Añade ruido realista según la ubicación del sensor
+    4. Genera datos a alta frecuencia (1000 Hz) vs video (30 Hz)
+    
+    PROPÓSITO:
+    - Permitir desarrollo sin hardware real
+    - Generar datos sintéticos para entrenamiento de modelos
+    - Validar algoritmos de fusión sensorial
+    - Demostrar capacidades del sistema completo
+    
+    UBICACIÓN DE LOS 11 SENSORES SIMULADOS:
+    0: Cabeza - movimiento suave, poca aceleración
+    1-2: Brazos - movimiento moderado durante técnica de vuelo
+    3-4: Antebrazos - movimiento más dinámico
+    5: Pecho - representa tronco, movimiento central
+    6: Lumbar - centro de masa, señal crítica
+    7-8: Muslos - alta aceleración durante despegue
+    9-10: Tobillos - máxima aceleración durante contacto con suelo
+    """
+    
+    # Constructor de la clase: Inicializa parámetros y componentes.
+    # num_sensors: Número de sensores a simular (11 por defecto).
+    # sample_rate: Frecuencia de muestreo en Hz (1000 Hz por defecto).
+    def __init__(self, num_sensors=11, sample_rate=1000):
+        """
+        INICIALIZACIÓN DEL SIMULADOR IMU
+        
+        Parámetros:
+        - num_sensors: Número de sensores a simular (11 por defecto)
+        - sample_rate: Frecuencia de muestreo en Hz (1000 Hz = 1 muestra/ms)
+        """
+        # Asigna número de sensores.
+        self.num_sensors = num_sensors
+        # Asigna frecuencia de muestreo.
+        self.sample_rate = sample_rate
+        # Flag de control de grabación (inicialmente False).
+        self.is_recording = False  # Flag de control de grabación
+        
+        # Buffer circular para almacenar datos IMU simulados (capacidad para ~50 segundos a 1000 Hz).
+        self.imu_data_buffer = deque(maxlen=50000)
+        
+        # =============================================================
+        # CONFIGURACIÓN ESPECÍFICA POR SENSOR
+        # =============================================================
+        # Cada sensor tiene características específicas según su ubicación:
+        # - location: Ubicación anatómica del sensor
+        # - noise_level: Nivel de ruido base (menor = más preciso)
+        
+        self.sensor_config = {
+            0: {'location': 'cabeza', 'noise_level': 0.1},        # Movimiento suave
+            1: {'location': 'brazo_izq', 'noise_level': 0.3},     # Movimiento moderado
+            2: {'location': 'brazo_der', 'noise_level': 0.3},     # Movimiento moderado
+            3: {'location': 'antebrazo_izq', 'noise_level': 0.4}, # Más dinámico
+            4: {'location': 'antebrazo_der', 'noise_level': 0.4}, # Más dinámico
+            5: {'location': 'pecho', 'noise_level': 0.2},         # Centro del tronco
+            6: {'location': 'lumbar', 'noise_level': 0.5},        # Centro de masa
+            7: {'location': 'muslo_izq', 'noise_level': 0.6},     # Alta aceleración
+            8: {'location': 'muslo_der', 'noise_level': 0.6},     # Alta aceleración
+            9: {'location': 'tobillo_izq', 'noise_level': 0.8},   # Máxima aceleración
+            10: {'location': 'tobillo_der', 'noise_level': 0.8}   # Máxima aceleración
+        }
+        
+        # Variables de estado para la simulación
+        self.last_visual_data = None  # Últimos datos visuales recibidos
+        self.simulation_time = 0      # Tiempo interno de simulación
+        # Función opcional que recibe cada lote de muestras simuladas
+        # (usada por el motor en proceso separado).
+        self.publicador = None
+    
+    # Método para actualizar el estado de simulación con datos visuales nuevos.
+    def actualizacion_datos_visuales(self, visual_data):
+        """
+        ACTUALIZACIÓN DEL ESTADO DE SIMULACIÓN
+        
+        Esta función recibe los datos más recientes del análisis visual
+        y actualiza el estado interno del simulador para generar
+        señales IMU coherentes con el movimiento observado.
+        """
+        # Asigna los datos visuales recibidos al estado interno.
+        self.last_visual_data = visual_data
+    
+    # Método para simular datos IMU basados en una muestra visual.
+    def simular_imu_pose(self, visual_sample):
+        """
+        SIMULACIÓN DE DATOS IMU BASADA EN POSE VISUAL
+        
+        Esta es la función central de la simulación. Toma una muestra
+        del análisis visual y genera múltiples muestras IMU correspondientes.
+        
+        PROCESO:
+        1. Extrae métricas de movimiento del análisis visual
+        2. Calcula cuántas muestras IMU generar por frame de video
+        3. Para cada sensor, simula señales realistas
+        4. Añade ruido apropiado según la ubicación
+        
+        La relación típica es ~33 muestras IMU por frame de video
+        (1000 Hz IMU / 30 Hz video = 33.3)
+        """
+        # Si no hay muestra visual, retorna lista vacía.
+        if not visual_sample:
+            return []
+        
+        # Lista para muestras simuladas.
+        simulated_samples = []
+        # Timestamp base de la muestra visual.
+        base_timestamp = visual_sample.get('timestamp', time.time())
+        
+        # =============================================================
+        # CÁLCULO DE MUESTRAS POR FRAME
+        # =============================================================
+        # Generar múltiples muestras IMU por cada frame de video
+        # para simular la mayor frecuencia de los sensores inerciales
+        samples_per_frame = max(1, int(self.sample_rate / 30))  # Asumiendo 30 FPS
+        
+        # Generar muestras con timestamps incrementales
+        for i in range(samples_per_frame):
+            # Offset de timestamp para cada muestra.
+            timestamp_offset = i * (1.0 / self.sample_rate)
+            
+            # Generar datos para cada uno de los 11 sensores
+            for sensor_id, config in self.sensor_config.items():
+                # Genera datos para el sensor específico.
+                imu_sample = self.generar_datos_sensor(
+                    sensor_id, 
+                    config, 
+                    visual_sample, 
+                    base_timestamp + timestamp_offset
+                )
+                # Agrega la muestra a la lista.
+                simulated_samples.append(imu_sample)
+        
+        # Retorna las muestras simuladas.
+        return simulated_samples
+    
+    # Método para generar datos de un sensor específico.
+    def generar_datos_sensor(self, sensor_id, config, visual_sample, timestamp):
+        """
+        GENERACIÓN DE DATOS PARA UN SENSOR ESPECÍFICO
+        
+        Esta función simula las señales de un sensor ICM-20948 real:
+        
+        SEÑALES SIMULADAS:
+        1. ACELERÓMETRO (3 ejes): Mide aceleración lineal en g's
+           - accel_x: Aceleración horizontal (dirección de carrera)
+           - accel_y: Aceleración vertical (gravedad + salto)
+           - accel_z: Aceleración lateral (estabilidad)
+        
+        2. GIROSCOPIO (3 ejes): Mide velocidad angular en °/s
+           - gyro_x, gyro_y, gyro_z: Rotaciones alrededor de cada eje
+        
+        3. MAGNETÓMETRO (3 ejes): Mide campo magnético en μT
+           - mag_x, mag_y, mag_z: Campo magnético terrestre + ruido
+        
+        La simulación se basa en:
+        - Ubicación del sensor en el cuerpo
+        - Métricas de movimiento del análisis visual
+        - Modelos físicos de movimiento humano
+        - Ruido realista según la ubicación
+        """
+        # Obtiene ubicación del sensor.
+        location = config['location']
+        # Obtiene nivel de ruido.
+        noise_level = config['noise_level']
+        
+        # =============================================================
+        # EXTRACCIÓN DE MÉTRICAS DE MOVIMIENTO
+        # =============================================================
+        # Velocidad horizontal estimada.
+        velocity_x = visual_sample.get('velocity_x_estimated', 0.0)  # Velocidad horizontal
+        # Altura de cadera.
+        hip_height = visual_sample.get('hip_height', 0.5)            # Altura de caderas
+        # Ángulo de rodilla derecha.
+        knee_angle_r = visual_sample.get('knee_angle_right', 180.0)  # Ángulo de rodilla
+        # Ángulo del tronco.
+        trunk_angle = visual_sample.get('trunk_angle', 90.0)         # Ángulo del tronco
+        
+        # =============================================================
+        # SIMULACIÓN DE ACELERÓMETRO POR UBICACIÓN
+        # =============================================================
+        
+        # Si es tobillo:
+        if 'tobillo' in location:
+            # TOBILLOS: Mayor aceleración durante contacto con suelo
+            # Durante el salto, los tobillos experimentan fuerzas de hasta 8-10g
+            base_accel_y = -9.81 + (20 * (1 - hip_height))  # Más fuerza cuando está más bajo
+            base_accel_x = velocity_x * 10                   # Proporcional a velocidad
+            base_accel_z = np.sin(np.radians(knee_angle_r)) * 5  # Relacionado con flexión
+            
+        # Si es muslo:
+        elif 'muslo' in location:
+            # MUSLOS: Aceleración relacionada con ángulo de rodilla
+            # Los muslos son críticos durante la fase de despegue
+            base_accel_y = -9.81 + np.cos(np.radians(knee_angle_r)) * 10
+            base_accel_x = velocity_x * 8
+            base_accel_z = np.sin(np.radians(trunk_angle)) * 3
+            
+        # Si es lumbar:
+        elif 'lumbar' in location:
+            # LUMBAR: Centro de masa, movimiento más suave
+            # Representa el centro de masa corporal total
+            base_accel_y = -9.81 + (hip_height - 0.5) * 15
+            base_accel_x = velocity_x * 5
+            base_accel_z = 0  # Movimiento lateral mínimo
+            
+        # Otros sensores:
+        else:
+            # OTROS SENSORES: Movimiento moderado (cabeza, brazos)
+            base_accel_y = -9.81 + np.random.normal(0, 2)
+            base_accel_x = velocity_x * 3
+            base_accel_z = np.random.normal(0, 1)
+        
+        # =============================================================
+        # ADICIÓN DE RUIDO REALISTA
+        # =============================================================
+        # Los sensores reales tienen ruido característico
+        noise_x = np.random.normal(0, noise_level)
+        noise_y = np.random.normal(0, noise_level)
+        noise_z = np.random.normal(0, noise_level)
+        
+        # =============================================================
+        # SIMULACIÓN DE GIROSCOPIO
+        # =============================================================
+        # Velocidades angulares con ruido proporcional
+        gyro_noise = noise_level * 10  # Giroscopio típicamente más ruidoso
+        base_gyro_x = np.random.normal(0, gyro_noise)
+        base_gyro_y = np.random.normal(0, gyro_noise)
+        base_gyro_z = np.random.normal(0, gyro_noise)
+        
+        # =============================================================
+        # SIMULACIÓN DE MAGNETÓMETRO
+        # =============================================================
+        # Campo magnético terrestre + perturbaciones
+        mag_noise = noise_level * 5
+        base_mag_x = 20 + np.random.normal(0, mag_noise)   # Componente Norte
+        base_mag_y = 40 + np.random.normal(0, mag_noise)   # Componente Este
+        base_mag_z = -30 + np.random.normal(0, mag_noise)  # Componente vertical
+        
+        # =============================================================
+        # MUESTRA COMPLETA DEL SENSOR
+        # =============================================================
+        # Retorna diccionario con todos los datos simulados.
+        return {
+            'timestamp': timestamp,
+            'sensor_id': sensor_id,
+            'location': location,
+            # Acelerómetro (m/s²)
+            'accel_x': base_accel_x + noise_x,
+            'accel_y': base_accel_y + noise_y,
+            'accel_z': base_accel_z + noise_z,
+            # Giroscopio (°/s)
+            'gyro_x': base_gyro_x,
+            'gyro_y': base_gyro_y,
+            'gyro_z': base_gyro_z,
+            # Magnetómetro (μT)
+            'mag_x': base_mag_x,
+            'mag_y': base_mag_y,
+            'mag_z': base_mag_z,
+            'system_timestamp': timestamp
+        }
+    
+    # Método para simular datos IMU en un hilo.
+    def simular_datos_imu(self, camera_system):
+        """
+        HILO PRINCIPAL DE SIMULACIÓN IMU
+        
+        Esta función se ejecuta en un hilo separado y:
+        1. Obtiene datos visuales más recientes
+        2. Simula señales IMU correspondientes
+        3. Almacena datos en buffer circular
+        4. Mantiene frecuencia de 1000 Hz
+        
+        La simulación es síncrona con el análisis visual
+        """
+        # Bucle mientras se grabe.
+        while self.is_recording:
+            # Obtener solo la muestra más reciente del sistema de cámara (sin copiar el buffer)
+            latest_sample = camera_system.obtener_ultima_muestra()
+            
+            # Si hay datos visuales:
+            if latest_sample is not None:
+                # Simular datos IMU correspondientes
+                simulated_samples = self.simular_imu_pose(latest_sample)
+                
+                # Almacenar todas las muestras generadas
+                for sample in simulated_samples:
+                    self.imu_data_buffer.append(sample)
+                # Publica el lote si hay un publicador.
+                if self.publicador is not None and simulated_samples:
+                    self.publicador(simulated_samples)
+            
+            # Control de frecuencia de simulación (duerme 1/sample_rate segundos).
+            time.sleep(1.0 / self.sample_rate)
+    
+    # Método para comenzar la grabación de simulación IMU.
+    def comenzar_grabacion(self, camera_system):
+        """Inicia la simulación IMU en hilo separado"""
+        # Activa flag de grabación.
+        self.is_recording = True
+        # Asigna referencia al sistema de cámara.
+        self.camera_system = camera_system
+        # Crea hilo para simulación (daemon=True).
+        self.imu_thread = threading.Thread(target=self.simular_datos_imu, args=(camera_system,), daemon=True)
+        # Inicia el hilo.
+        self.imu_thread.start()
+        # Registra inicio.
+        logger.info("Simulación IMU iniciada")
+    
+    # Método para detener la grabación de simulación IMU.
+    def detener_grabacion(self):
+        """Detiene la simulación IMU"""
+        # Desactiva flag.
+        self.is_recording = False
+        # Si existe hilo, espera a que termine (timeout 2s).
+        if hasattr(self, 'imu_thread'):
+            self.imu_thread.join(timeout=2)
+        # Registra detención.
+        logger.info("Simulación IMU detenida")
+    
+    # Método para obtener todos los datos IMU simulados como lista.
+    def obtener_datos_imu(self):
+        """Retorna todos los datos IMU simulados"""
+        return list(self.imu_data_buffer)
+
+    # Método para validar coherencia entre sensores IMU.
+    def validar_coherencia_imu(self):
+        """
+        VALIDACIÓN DE COHERENCIA ENTRE SENSORES IMU
+        Verifica que los sensores simulados sean consistentes entre sí
+        """
+        # Si menos de 10 muestras, retorna scores cero.
+        if len(self.imu_data_buffer) < 10:
+            return {'imu_coherencia': 0, 'acceleration_validity': 0}
+
+        # Toma las últimas 50 muestras.
+        recent_samples = list(self.imu_data_buffer)[-50:]  # Últimas 50 muestras
+
+        # Bloque try para cálculos.
+        try:
+            # Agrupar por timestamp (redondeado a 3 decimales).
+            by_timestamp = {}
+            for sample in recent_samples:
+                ts = round(sample['timestamp'], 3)  # Redondear para agrupar
+                if ts not in by_timestamp:
+                    by_timestamp[ts] = []
+                by_timestamp[ts].append(sample)
+
+            # Validar coherencia bilateral
+            coherence_scores = []
+            acceleration_violations = 0
+            total_samples = 0
+
+            # Límites de aceleración por ubicación
+            accel_limits = {
+                'tobillo': 25.0,  # g's
+                'muslo': 20.0,
+                'lumbar': 10.0,
+                'brazo': 8.0,
+                'cabeza': 5.0
+            }
+
+            # Para cada grupo de timestamp:
+            for timestamp, sensors in by_timestamp.items():
+                # Si al menos 2 sensores:
+                if len(sensors) >= 2:
+                    # Listas para aceleraciones izquierda y derecha.
+                    left_accels = []
+                    right_accels = []
+
+                    # Para cada sensor en el grupo:
+                    for sensor in sensors:
+                        # Magnitud de aceleración.
+                        accel_mag = np.sqrt(sensor['accel_x']**2 + sensor['accel_y']**2 + sensor['accel_z']**2)
+
+                        # Validar límites de aceleración
+                        limit = 15.0  # Por defecto
+                        for loc, lim in accel_limits.items():
+                            if loc in sensor['location']:
+                                limit = lim
+                                break
+                            
+                        # Si excede límite, incrementa violaciones.
+                        if accel_mag > limit:
+                            acceleration_violations += 1
+                        # Incrementa total de muestras.
+                        total_samples += 1
+
+                        # Agrupar por lado
+                        if 'izq' in sensor['location']:
+                            left_accels.append(accel_mag)
+                        elif 'der' in sensor['location']:
+                            right_accels.append(accel_mag)
+
+                    # Calcular simetría bilateral
+                    if left_accels and right_accels:
+                        # Promedio izquierda.
+                        left_avg = np.mean(left_accels)
+                        # Promedio derecha.
+                        right_avg = np.mean(right_accels)
+                        # Si máximo > 0:
+                        if max(left_avg, right_avg) > 0:
+                            # Simetría como 1 - diferencia relativa.
+                            symmetry = 1.0 - abs(left_avg - right_avg) / max(left_avg, right_avg)
+                            # Agrega score (mínimo 0).
+                            coherence_scores.append(max(0, symmetry))
+
+            # Calcular métricas finales
+            # Coherencia promedio.
+            imu_coherence = np.mean(coherence_scores) if coherence_scores else 0
+            # Validez de aceleración como 1 - proporción de violaciones.
+            acceleration_validity = 1.0 - (acceleration_violations / max(total_samples, 1))
+
+            # Retorna diccionario con métricas.
+            return {
+                'imu_coherence': imu_coherence,
+                'acceleration_validity': acceleration_validity,
+                'bilateral_samples': len(coherence_scores)
+            }
+
+        # Maneja excepciones.
+        except Exception as e:
+            # Registra advertencia.
+            logger.warning(f"Error validando coherencia IMU: {e}")
+            # Retorna scores cero.
+            return {'imu_coherence': 0, 'acceleration_validity': 0}